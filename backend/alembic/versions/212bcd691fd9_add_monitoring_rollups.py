@@ -0,0 +1,42 @@
+"""Add monitoring rollups
+
+Revision ID: 212bcd691fd9
+Revises: f61bf0390f5a
+Create Date: 2026-10-16 10:03:17.884210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '212bcd691fd9'
+down_revision: Union[str, None] = 'f61bf0390f5a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('monitoring_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('website_id', sa.Integer(), nullable=True),
+    sa.Column('resolution', sa.String(), nullable=True),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('count', sa.Integer(), nullable=True),
+    sa.Column('up_count', sa.Integer(), nullable=True),
+    sa.Column('response_count', sa.Integer(), nullable=True),
+    sa.Column('response_time_sum', sa.Float(), nullable=True),
+    sa.Column('response_time_histogram', sa.JSON(), nullable=True),
+    sa.Column('status_codes', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['website_id'], ['websites.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('website_id', 'resolution', 'bucket_start', name='uq_monitoring_rollups_bucket')
+    )
+    op.create_index(op.f('ix_monitoring_rollups_id'), 'monitoring_rollups', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_monitoring_rollups_id'), table_name='monitoring_rollups')
+    op.drop_table('monitoring_rollups')
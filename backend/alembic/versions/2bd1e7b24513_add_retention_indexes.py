@@ -0,0 +1,55 @@
+"""Add indexes used by retention deletes
+
+Revision ID: 2bd1e7b24513
+Revises: d1ff7f5a10e9
+Create Date: 2026-10-17 09:41:06.270518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2bd1e7b24513'
+down_revision: Union[str, None] = 'd1ff7f5a10e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RESULT_TABLES = ['monitoring_results', 'ssl_checks', 'security_headers']
+
+
+def upgrade() -> None:
+    # Build the indexes without locking writes on large Postgres tables
+    with op.get_context().autocommit_block():
+        for table in RESULT_TABLES:
+            op.create_index(
+                op.f(f'ix_{table}_timestamp'),
+                table,
+                ['timestamp'],
+                unique=False,
+                postgresql_concurrently=True,
+            )
+        op.create_index(
+            op.f('ix_monitoring_rollups_resolution_bucket_start'),
+            'monitoring_rollups',
+            ['resolution', 'bucket_start'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_monitoring_rollups_resolution_bucket_start'),
+            table_name='monitoring_rollups',
+            postgresql_concurrently=True,
+        )
+        for table in RESULT_TABLES:
+            op.drop_index(
+                op.f(f'ix_{table}_timestamp'),
+                table_name=table,
+                postgresql_concurrently=True,
+            )
@@ -0,0 +1,30 @@
+"""Drop the server default of websites.initial_check_status
+
+Revision ID: 653ecfd06718
+Revises: 2bd1e7b24513
+Create Date: 2026-10-18 10:12:37.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '653ecfd06718'
+down_revision: Union[str, None] = '2bd1e7b24513'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The 'done' default only backfilled websites that existed before the
+    # column; rows inserted outside the ORM must not skip their first check
+    with op.batch_alter_table('websites') as batch_op:
+        batch_op.alter_column('initial_check_status', existing_type=sa.String(), server_default=None)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('websites') as batch_op:
+        batch_op.alter_column('initial_check_status', existing_type=sa.String(), server_default='done')
@@ -0,0 +1,32 @@
+"""Add probe phase timings to MonitoringResult
+
+Revision ID: a10020dd32b2
+Revises: e1c543ca1536
+Create Date: 2026-10-16 14:02:11.583204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a10020dd32b2'
+down_revision: Union[str, None] = 'e1c543ca1536'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('monitoring_results', sa.Column('dns_time', sa.Float(), nullable=True))
+    op.add_column('monitoring_results', sa.Column('connect_time', sa.Float(), nullable=True))
+    op.add_column('monitoring_results', sa.Column('ttfb', sa.Float(), nullable=True))
+    op.add_column('monitoring_results', sa.Column('transfer_time', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('monitoring_results', 'transfer_time')
+    op.drop_column('monitoring_results', 'ttfb')
+    op.drop_column('monitoring_results', 'connect_time')
+    op.drop_column('monitoring_results', 'dns_time')
@@ -0,0 +1,36 @@
+"""Add check queue
+
+Revision ID: d1ff7f5a10e9
+Revises: a10020dd32b2
+Create Date: 2026-10-16 15:27:40.118356
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1ff7f5a10e9'
+down_revision: Union[str, None] = 'a10020dd32b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('check_queue',
+    sa.Column('website_id', sa.Integer(), nullable=False),
+    sa.Column('due_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('leased_by', sa.String(), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_run_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['website_id'], ['websites.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('website_id')
+    )
+    op.create_index('ix_check_queue_due_at', 'check_queue', ['due_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_check_queue_due_at', table_name='check_queue')
+    op.drop_table('check_queue')
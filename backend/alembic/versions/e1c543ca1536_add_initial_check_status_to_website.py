@@ -0,0 +1,28 @@
+"""Add initial_check_status to Website
+
+Revision ID: e1c543ca1536
+Revises: 212bcd691fd9
+Create Date: 2026-10-16 11:21:45.310962
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1c543ca1536'
+down_revision: Union[str, None] = '212bcd691fd9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing websites already had their first check run inline; the
+    # default is dropped again in 653ecfd06718
+    op.add_column('websites', sa.Column('initial_check_status', sa.String(), server_default='done', nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('websites', 'initial_check_status')
@@ -0,0 +1,43 @@
+"""Add website_id/timestamp indexes to result tables
+
+Revision ID: f61bf0390f5a
+Revises: 67504c0d3221
+Create Date: 2026-10-16 09:12:41.502317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f61bf0390f5a'
+down_revision: Union[str, None] = '67504c0d3221'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RESULT_TABLES = ['monitoring_results', 'ssl_checks', 'security_headers']
+
+
+def upgrade() -> None:
+    # Build the indexes without locking writes on large Postgres tables
+    with op.get_context().autocommit_block():
+        for table in RESULT_TABLES:
+            op.create_index(
+                op.f(f'ix_{table}_website_id_timestamp'),
+                table,
+                ['website_id', 'timestamp'],
+                unique=False,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in RESULT_TABLES:
+            op.drop_index(
+                op.f(f'ix_{table}_website_id_timestamp'),
+                table_name=table,
+                postgresql_concurrently=True,
+            )
@@ -1 +1,82 @@
- 
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Authentication
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))  # in seconds, 0 disables the cache
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))  # threads hashing passwords
+
+# Outbound HTTP client used by all probes
+HTTP_TOTAL_TIMEOUT = float(os.getenv("HTTP_TOTAL_TIMEOUT", "30"))  # in seconds
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))  # in seconds
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "20"))  # in seconds
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "500"))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "4"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "60"))  # in seconds
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))  # in seconds
+
+# TLS certificate checks
+TLS_CHECK_TIMEOUT = float(os.getenv("TLS_CHECK_TIMEOUT", "10"))  # connect + handshake, in seconds
+TLS_CHECK_CONCURRENCY = int(os.getenv("TLS_CHECK_CONCURRENCY", "200"))
+
+# Per-host limits on probes, so websites sharing a host don't trip its rate limiter
+HOST_MAX_CONCURRENCY = int(os.getenv("HOST_MAX_CONCURRENCY", "4"))
+HOST_RATE_PER_SEC = float(os.getenv("HOST_RATE_PER_SEC", "2"))  # requests per second, 0 disables
+HOST_BURST = float(os.getenv("HOST_BURST", "5"))
+
+# Check scheduler
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+SCHEDULER_SYNC_INTERVAL = float(os.getenv("SCHEDULER_SYNC_INTERVAL", "60"))  # in seconds
+MIN_MONITORING_INTERVAL = int(os.getenv("MIN_MONITORING_INTERVAL", "60"))  # in seconds
+
+# Scheduling mode: "inprocess" runs checks in the API process, "queue"
+# leaves them to worker.py processes claiming leases from the check_queue table
+SCHEDULER_MODE = os.getenv("SCHEDULER_MODE", "inprocess").lower()
+QUEUE_LEASE_SECONDS = float(os.getenv("QUEUE_LEASE_SECONDS", "120"))  # renewed while a check runs
+QUEUE_CLAIM_BATCH_SIZE = int(os.getenv("QUEUE_CLAIM_BATCH_SIZE", "100"))
+QUEUE_POLL_INTERVAL = float(os.getenv("QUEUE_POLL_INTERVAL", "1"))  # in seconds
+QUEUE_SYNC_INTERVAL = float(os.getenv("QUEUE_SYNC_INTERVAL", "60"))  # in seconds
+
+# Check execution
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "50"))
+CHECK_TIMEOUT = float(os.getenv("CHECK_TIMEOUT", "60"))  # per check, in seconds
+# Probe processes for SCHEDULER_MODE=inprocess; above 1, websites are sharded by host
+# across that many processes, each with its own event loop and HTTP client
+PROBE_PROCESSES = int(os.getenv("PROBE_PROCESSES", "1"))
+PROBE_RESULT_QUEUE_SIZE = int(os.getenv("PROBE_RESULT_QUEUE_SIZE", "100"))  # result batches in flight to the writer
+PROBE_STATS_INTERVAL = float(os.getenv("PROBE_STATS_INTERVAL", "5"))  # scheduler stats reports, in seconds
+PROBE_WATCHDOG_INTERVAL = float(os.getenv("PROBE_WATCHDOG_INTERVAL", "5"))  # dead process checks, in seconds
+PROBE_BODY_MAX_BYTES = int(os.getenv("PROBE_BODY_MAX_BYTES", "1048576"))  # body bytes timed per check; 0 skips body timing
+
+# Batched result writes
+SINK_BATCH_SIZE = int(os.getenv("SINK_BATCH_SIZE", "500"))
+SINK_FLUSH_INTERVAL = float(os.getenv("SINK_FLUSH_INTERVAL", "2"))  # in seconds
+SINK_MAX_PENDING = int(os.getenv("SINK_MAX_PENDING", "10000"))
+SINK_MAX_RETRIES = int(os.getenv("SINK_MAX_RETRIES", "3"))
+
+# Data retention
+RETENTION_ENABLED = os.getenv("RETENTION_ENABLED", "true").lower() == "true"
+RETENTION_RAW_DAYS = int(os.getenv("RETENTION_RAW_DAYS", "14"))
+RETENTION_MINUTE_ROLLUP_DAYS = int(os.getenv("RETENTION_MINUTE_ROLLUP_DAYS", "30"))
+RETENTION_ROLLUP_DAYS = int(os.getenv("RETENTION_ROLLUP_DAYS", "365"))  # hour and day rollups
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "5000"))
+RETENTION_INTERVAL = float(os.getenv("RETENTION_INTERVAL", "3600"))  # in seconds
+
+# Bulk website import
+BULK_IMPORT_MAX_ROWS = int(os.getenv("BULK_IMPORT_MAX_ROWS", "10000"))
+BULK_IMPORT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "500"))
+BULK_IMPORT_SPREAD_SECONDS = float(os.getenv("BULK_IMPORT_SPREAD_SECONDS", "300"))  # window for first checks
+
+# History export
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))  # rows fetched per round-trip
+
+# Live event stream
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))  # events buffered per subscriber
+EVENT_KEEPALIVE_INTERVAL = float(os.getenv("EVENT_KEEPALIVE_INTERVAL", "15"))  # in seconds
+# SCHEDULER_MODE=queue or PROBE_PROCESSES > 1: how often the API polls for results written elsewhere
+EVENT_RELAY_INTERVAL = float(os.getenv("EVENT_RELAY_INTERVAL", "2"))  # in seconds
+EVENT_RELAY_BATCH_SIZE = int(os.getenv("EVENT_RELAY_BATCH_SIZE", "1000"))  # rows per poll
@@ -1,8 +1,8 @@
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import uvicorn
-from database import engine, Base, get_db
+from database import engine, async_engine, Base, get_db
 from routes.monitor import router as monitor_router
 import models
 import schemas
@@ -10,8 +10,23 @@ from utils.security import (
     get_current_active_user,
     create_access_token,
     authenticate_user,
-    get_password_hash,
+    hash_password,
+    get_user_by_email,
+    user_cache_stats,
 )
+from services.http_client import start_http_client, close_http_client
+from services.monitor_service import monitor_website_group
+from services.scheduler import start_scheduler, stop_scheduler, get_scheduler
+from services.worker_pool import start_worker_pool, stop_worker_pool, get_worker_pool
+from services.result_sink import start_result_sink, stop_result_sink, get_result_sink
+from services.probe_processes import start_probe_processes, stop_probe_processes, get_probe_processes
+from services.event_broker import event_broker
+from services.event_relay import start_event_relay, stop_event_relay
+from services.check_queue import queue_stats
+from services.host_limiter import get_host_limiter
+from services.retention import start_retention_job, stop_retention_job
+import config
+from contextlib import asynccontextmanager
 from datetime import timedelta
 import os
 from dotenv import load_dotenv
@@ -22,11 +37,42 @@ load_dotenv()
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Manage resources shared across requests and background checks."""
+    await start_http_client()
+    await start_result_sink()
+    pool = await start_worker_pool(monitor_website_group)
+    # In queue mode checks are run by worker.py processes instead
+    if config.SCHEDULER_ENABLED and config.SCHEDULER_MODE == "inprocess":
+        if config.PROBE_PROCESSES > 1:
+            await start_probe_processes()
+        else:
+            await start_scheduler(pool.run)
+    # Results written by other processes only reach this process's
+    # subscribers through the database
+    if config.SCHEDULER_MODE == "queue" or get_probe_processes() is not None:
+        await start_event_relay()
+    if config.RETENTION_ENABLED:
+        await start_retention_job()
+    try:
+        yield
+    finally:
+        await stop_retention_job()
+        await stop_event_relay()
+        await stop_scheduler()
+        await stop_probe_processes()
+        await stop_worker_pool()
+        await stop_result_sink()
+        await close_http_client()
+        await async_engine.dispose()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Website Monitoring API",
     description="API for monitoring websites, SSL certificates, and security headers",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -36,14 +82,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(monitor_router)
 
 # Auth endpoints
 @app.post("/token", response_model=schemas.Token)
-async def login_for_access_token(email: str, password: str, db: Session = Depends(get_db)):
-    user = authenticate_user(db, email, password)
+async def login_for_access_token(email: str, password: str, db: AsyncSession = Depends(get_db)):
+    user = await authenticate_user(db, email, password)
     if not user:
         raise HTTPException(
             status_code=401,
@@ -60,17 +107,17 @@ async def login_for_access_token(email: str, password: str, db: Session = Depend
 
 # User endpoints
 @app.post("/users/", response_model=schemas.User)
-def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
+    db_user = await get_user_by_email(db, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await hash_password(user.password)
     db_user = models.User(email=user.email, hashed_password=hashed_password)
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 @app.get("/users/me", response_model=schemas.User)
@@ -80,7 +127,25 @@ async def read_users_me(current_user: models.User = Depends(get_current_active_u
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    scheduler = get_scheduler()
+    pool = get_worker_pool()
+    sink = get_result_sink()
+    probe_processes = get_probe_processes()
+    scheduler_stats = scheduler.stats() if scheduler else None
+    if probe_processes:
+        # Each probe process runs its own scheduler
+        scheduler_stats = probe_processes.scheduler_stats()
+    return {
+        "status": "healthy",
+        "scheduler": scheduler_stats,
+        "probe_processes": probe_processes.stats() if probe_processes else None,
+        "queue": await queue_stats() if config.SCHEDULER_MODE == "queue" else None,
+        "workers": pool.stats() if pool else None,
+        "result_sink": sink.stats() if sink else None,
+        "host_limits": get_host_limiter().stats(),
+        "events": event_broker.stats(),
+        "user_cache": user_cache_stats()
+    }
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
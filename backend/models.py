@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Float, JSON
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, DateTime, Float, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -22,6 +22,7 @@ class Website(Base):
     owner_id = Column(Integer, ForeignKey("users.id"))
     is_active = Column(Boolean, default=True)
     monitoring_interval = Column(Integer, default=300)  # in seconds
+    initial_check_status = Column(String, default="pending")  # pending, running, done or failed
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     owner = relationship("User", back_populates="websites")
@@ -34,13 +35,22 @@ class MonitoringResult(Base):
     id = Column(Integer, primary_key=True, index=True)
     website_id = Column(Integer, ForeignKey("websites.id"))
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
-    response_time = Column(Float)  # in seconds
+    response_time = Column(Float)  # in seconds, until the response headers
     status_code = Column(Integer)
     is_up = Column(Boolean)
     error_message = Column(String, nullable=True)
+    dns_time = Column(Float, nullable=True)  # in seconds
+    connect_time = Column(Float, nullable=True)  # TCP connect and TLS handshake, in seconds
+    ttfb = Column(Float, nullable=True)  # request sent to response headers, in seconds
+    transfer_time = Column(Float, nullable=True)  # body download up to PROBE_BODY_MAX_BYTES, in seconds
     
     website = relationship("Website", back_populates="monitoring_results")
 
+    __table_args__ = (
+        Index("ix_monitoring_results_website_id_timestamp", "website_id", "timestamp"),
+        Index("ix_monitoring_results_timestamp", "timestamp"),  # retention deletes
+    )
+
 class SSLCheck(Base):
     __tablename__ = "ssl_checks"
 
@@ -54,6 +64,11 @@ class SSLCheck(Base):
     
     website = relationship("Website", back_populates="ssl_checks")
 
+    __table_args__ = (
+        Index("ix_ssl_checks_website_id_timestamp", "website_id", "timestamp"),
+        Index("ix_ssl_checks_timestamp", "timestamp"),  # retention deletes
+    )
+
 class SecurityHeader(Base):
     __tablename__ = "security_headers"
 
@@ -63,3 +78,40 @@ class SecurityHeader(Base):
     headers = Column(JSON)  # Stores all security headers
     score = Column(Integer)  # Security score based on headers 
     error_message = Column(String, nullable=True)  # Add this field
+
+    __table_args__ = (
+        Index("ix_security_headers_website_id_timestamp", "website_id", "timestamp"),
+        Index("ix_security_headers_timestamp", "timestamp"),  # retention deletes
+    )
+
+class MonitoringRollup(Base):
+    __tablename__ = "monitoring_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    website_id = Column(Integer, ForeignKey("websites.id"))
+    resolution = Column(String)  # minute, hour or day
+    bucket_start = Column(DateTime(timezone=True))
+    count = Column(Integer, default=0)
+    up_count = Column(Integer, default=0)
+    response_count = Column(Integer, default=0)  # checks that got an HTTP response
+    response_time_sum = Column(Float, default=0.0)  # in seconds
+    response_time_histogram = Column(JSON)  # log-scale bucket -> count
+    status_codes = Column(JSON)  # status code -> count
+
+    __table_args__ = (
+        UniqueConstraint("website_id", "resolution", "bucket_start", name="uq_monitoring_rollups_bucket"),
+        Index("ix_monitoring_rollups_resolution_bucket_start", "resolution", "bucket_start"),  # retention deletes
+    )
+
+class CheckQueueEntry(Base):
+    __tablename__ = "check_queue"
+
+    website_id = Column(Integer, ForeignKey("websites.id", ondelete="CASCADE"), primary_key=True)
+    due_at = Column(DateTime(timezone=True), nullable=False)
+    leased_by = Column(String, nullable=True)  # worker holding the check
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_check_queue_due_at", "due_at"),
+    )
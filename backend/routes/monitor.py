@@ -1,60 +1,355 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import csv
+import io
+import json
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
 import models
 import schemas
+import config
 from database import get_db
-from services.monitor_service import monitor_website, check_website_health, check_ssl_certificate, check_security_headers
+from services.monitor_service import monitor_website, refresh_website
+from services.scheduler import get_scheduler
+from services.probe_processes import get_probe_processes
+from services.worker_pool import get_worker_pool
+from services.rollup_service import summarize_rollup
+from services.export_service import EXPORT_MEDIA_TYPES, arrow_available, export_history
+from services.event_broker import event_broker
+from services.check_queue import enqueue_checks
 from utils.security import get_current_active_user
+from utils.pagination import encode_cursor, decode_cursor
+from utils.timestamps import as_utc
+from utils.urls import normalize_url
+from utils.downsample import lttb, min_max_buckets
 
 router = APIRouter(
     prefix="/monitor",
     tags=["monitoring"]
 )
 
+# Time range returned by the stats endpoint when `from` is omitted
+DEFAULT_STATS_RANGE = {
+    "minute": timedelta(days=1),
+    "hour": timedelta(days=7),
+    "day": timedelta(days=90),
+}
+
+async def get_user_website(db: AsyncSession, website_id: int, user: models.User) -> Optional[models.Website]:
+    """Load a website owned by the given user."""
+    result = await db.execute(
+        select(models.Website).where(
+            models.Website.id == website_id,
+            models.Website.owner_id == user.id
+        )
+    )
+    return result.scalars().first()
+
 @router.post("/websites/", response_model=schemas.Website)
 async def add_website_for_monitoring(
     website: schemas.WebsiteCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    """Add a new website and start monitoring it."""
+    """
+    Add a new website and start monitoring it.
+
+    The first check runs in the background; its progress is reported in
+    the website's initial_check_status.
+    """
     # Create website record
     db_website = models.Website(
-        **website.model_dump(),
-        owner_id=current_user.id
+        **website.model_dump(mode="json"),
+        owner_id=current_user.id,
+        initial_check_status="pending"
     )
     db.add(db_website)
-    db.commit()
-    db.refresh(db_website)
+    await db.commit()
+    await db.refresh(db_website)
     
-    # Start initial monitoring
-    await monitor_website(db, db_website)
+    # Queue the first check; the scheduler also runs the follow-up checks
+    scheduler = get_scheduler() or get_probe_processes()
+    pool = get_worker_pool()
+    if scheduler:
+        scheduler.schedule(db_website.id, str(db_website.url), db_website.monitoring_interval)
+    elif config.SCHEDULER_MODE == "queue":
+        await enqueue_checks(db, [(db_website.id, 0.0)])
+    elif pool:
+        pool.submit([db_website.id])
     
     return db_website
 
+async def read_bulk_import_rows(request: Request) -> List[Dict[str, Any]]:
+    """Read import rows from a JSON array, a CSV body or a multipart CSV upload."""
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Expected a CSV upload in the 'file' field")
+        data = await upload.read()
+    elif content_type.startswith("text/csv"):
+        data = await request.body()
+    else:
+        try:
+            rows = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Expected a JSON array or CSV")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of websites")
+        return rows
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV must be UTF-8 encoded")
+    # Empty CSV cells fall back to the schema defaults
+    return [
+        {key: value for key, value in row.items() if key and value not in (None, "")}
+        for row in csv.DictReader(io.StringIO(text))
+    ]
+
+@router.post("/websites/bulk", response_model=schemas.BulkImportResult)
+async def bulk_import_websites(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Add many websites at once from a JSON array or a CSV file.
+
+    CSV files need `url` and `name` columns and may have a
+    `monitoring_interval` column. Invalid rows and URLs the user already
+    monitors (or that appear earlier in the import) are reported and
+    skipped; first checks are spread over BULK_IMPORT_SPREAD_SECONDS.
+    """
+    raw_rows = await read_bulk_import_rows(request)
+    if len(raw_rows) > config.BULK_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {config.BULK_IMPORT_MAX_ROWS} websites can be imported at once"
+        )
+    
+    # Normalized URL -> where it was seen, to skip websites the user already monitors
+    existing = await db.execute(select(models.Website.url).where(models.Website.owner_id == current_user.id))
+    seen = {normalize_url(url): None for url in existing.scalars() if url}
+    
+    valid_rows = []
+    errors = []
+    for index, raw_row in enumerate(raw_rows, start=1):
+        try:
+            website = schemas.WebsiteCreate.model_validate(raw_row)
+        except ValidationError as e:
+            message = "; ".join(
+                f"{'.'.join(str(loc) for loc in error['loc']) or 'row'}: {error['msg']}" for error in e.errors()
+            )
+            errors.append({"row": index, "error": message})
+            continue
+        target = normalize_url(str(website.url))
+        if target in seen:
+            duplicate_of = "an existing website" if seen[target] is None else f"row {seen[target]}"
+            errors.append({"row": index, "error": f"url: Duplicate of {duplicate_of}"})
+            continue
+        seen[target] = index
+        valid_rows.append({
+            **website.model_dump(mode="json"),
+            "owner_id": current_user.id,
+            "is_active": True,
+            "initial_check_status": "pending"
+        })
+    
+    # Insert in batches, each in its own transaction
+    created = []
+    for start in range(0, len(valid_rows), config.BULK_IMPORT_BATCH_SIZE):
+        batch = valid_rows[start:start + config.BULK_IMPORT_BATCH_SIZE]
+        result = await db.execute(
+            insert(models.Website).returning(
+                models.Website.id, models.Website.url, models.Website.monitoring_interval
+            ),
+            batch
+        )
+        created.extend(result.all())
+        await db.commit()
+    
+    # Spread the first checks out instead of probing every website at once
+    scheduler = get_scheduler() or get_probe_processes()
+    pool = get_worker_pool()
+    loop = asyncio.get_running_loop()
+    delays = [(row, config.BULK_IMPORT_SPREAD_SECONDS * index / len(created)) for index, row in enumerate(created)]
+    if scheduler:
+        for row, delay in delays:
+            scheduler.schedule(row.id, row.url, row.monitoring_interval, delay=delay)
+    elif config.SCHEDULER_MODE == "queue":
+        await enqueue_checks(db, [(row.id, delay) for row, delay in delays])
+    elif pool:
+        for row, delay in delays:
+            loop.call_later(delay, pool.submit, [row.id])
+    
+    return {
+        "created": len(created),
+        "failed": len(errors),
+        "website_ids": [row.id for row in created],
+        "errors": errors
+    }
+
 @router.get("/websites/", response_model=List[schemas.Website])
 async def get_monitored_websites(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
     """Get all monitored websites for current user."""
-    return db.query(models.Website).filter(
-        models.Website.owner_id == current_user.id,
+    result = await db.execute(
+        select(models.Website).where(
+            models.Website.owner_id == current_user.id,
+            models.Website.is_active == True
+        )
+    )
+    return result.scalars().all()
+
+def latest_rows_query(model, user: models.User):
+    """
+    Select the latest row of a result table for each of a user's active websites.
+
+    Uses one correlated top-1 subquery per website, which the
+    (website_id, timestamp) index answers without scanning history.
+    """
+    latest_id = select(model.id).where(
+        model.website_id == models.Website.id
+    ).order_by(model.timestamp.desc(), model.id.desc()).limit(1).correlate(models.Website).scalar_subquery()
+    latest_ids = select(latest_id).where(
+        models.Website.owner_id == user.id,
         models.Website.is_active == True
-    ).all()
+    )
+    return select(model).where(model.id.in_(latest_ids))
+
+@router.get("/summary", response_model=List[schemas.WebsiteSummary])
+async def get_monitoring_summary(
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Get the latest status of every monitored website in a fixed number of queries."""
+    websites = (await db.execute(
+        select(models.Website).where(
+            models.Website.owner_id == current_user.id,
+            models.Website.is_active == True
+        ).order_by(models.Website.id)
+    )).scalars().all()
+    
+    results = {
+        row.website_id: row
+        for row in (await db.execute(latest_rows_query(models.MonitoringResult, current_user))).scalars()
+    }
+    ssl_checks = {
+        row.website_id: row
+        for row in (await db.execute(latest_rows_query(models.SSLCheck, current_user))).scalars()
+    }
+    security_headers = {
+        row.website_id: row
+        for row in (await db.execute(latest_rows_query(models.SecurityHeader, current_user))).scalars()
+    }
+    
+    summary = []
+    for website in websites:
+        result = results.get(website.id)
+        ssl_check = ssl_checks.get(website.id)
+        security_header = security_headers.get(website.id)
+        summary.append({
+            "id": website.id,
+            "name": website.name,
+            "url": website.url,
+            "monitoring_interval": website.monitoring_interval,
+            "initial_check_status": website.initial_check_status,
+            "last_checked_at": result.timestamp if result else None,
+            "is_up": result.is_up if result else None,
+            "status_code": result.status_code if result else None,
+            "response_time": result.response_time if result else None,
+            "ssl_valid": ssl_check.is_valid if ssl_check else None,
+            "ssl_expires_at": ssl_check.expires_at if ssl_check else None,
+            "security_score": security_header.score if security_header else None,
+        })
+    return summary
+
+@router.get("/export")
+async def export_monitoring_history(
+    kind: str = Query("results", pattern="^(results|ssl|security)$"),
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv|arrow)$"),
+    website_id: Optional[int] = None,
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Stream monitoring results, SSL checks or security headers history.
+
+    Covers one website, or all of the current user's websites when
+    `website_id` is omitted. The `arrow` format (Arrow IPC stream)
+    requires pyarrow.
+    """
+    website_ids = select(models.Website.id).where(models.Website.owner_id == current_user.id)
+    if website_id is not None:
+        if not await get_user_website(db, website_id, current_user):
+            raise HTTPException(status_code=404, detail="Website not found")
+        website_ids = website_ids.where(models.Website.id == website_id)
+    if export_format == "arrow" and not arrow_available():
+        raise HTTPException(status_code=400, detail="Arrow export requires pyarrow to be installed")
+    
+    extension = {"ndjson": "ndjson", "csv": "csv", "arrow": "arrows"}[export_format]
+    return StreamingResponse(
+        export_history(kind, export_format, website_ids, from_, to),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{extension}"'}
+    )
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Push check results and up/down state changes as Server-Sent Events.
+
+    Covers the websites the current user has when connecting; reconnect to
+    pick up newly added ones. A client that falls behind gets a `lagged`
+    event with the number of events it missed. With SCHEDULER_MODE=queue
+    or PROBE_PROCESSES above 1, results are relayed from the database and
+    arrive up to EVENT_RELAY_INTERVAL seconds late.
+    """
+    result = await db.execute(select(models.Website.id).where(models.Website.owner_id == current_user.id))
+    subscription = event_broker.subscribe(result.scalars().all())
+    # Release the connection; the stream can stay open for hours
+    await db.commit()
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=config.EVENT_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.post("/websites/{website_id}/check")
 async def check_website(
     website_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
     """Manually trigger a website check."""
-    website = db.query(models.Website).filter(
-        models.Website.id == website_id,
-        models.Website.owner_id == current_user.id
-    ).first()
+    website = await get_user_website(db, website_id, current_user)
     
     if not website:
         raise HTTPException(status_code=404, detail="Website not found")
@@ -62,78 +357,244 @@ async def check_website(
     await monitor_website(db, website)
     return {"status": "success", "message": "Website check completed"}
 
+async def get_latest_result(
+    db: AsyncSession,
+    website: models.Website,
+    model,
+    fields: List[str],
+    max_age: Optional[int],
+    fresh: bool
+) -> Optional[Dict[str, Any]]:
+    """
+    Return the latest stored result of a website, probing it first if needed.
+
+    A probe runs when `fresh` is set, when nothing is stored yet, or when
+    the stored result is older than `max_age` seconds. Returns None when
+    the probe stored no row of this kind (the website is down).
+    """
+    if not fresh:
+        result = await db.execute(
+            select(model).where(model.website_id == website.id).order_by(
+                model.timestamp.desc(), model.id.desc()
+            ).limit(1)
+        )
+        row = result.scalars().first()
+        if row is not None:
+            if max_age is None or datetime.now(timezone.utc) - as_utc(row.timestamp) <= timedelta(seconds=max_age):
+                return {"timestamp": row.timestamp, **{field: getattr(row, field) for field in fields}}
+    
+    rows = await refresh_website(website)
+    row = rows.get(model)
+    if row is None:
+        return None
+    return {"timestamp": row["timestamp"], **{field: row[field] for field in fields}}
+
 @router.get("/websites/{website_id}/health")
 async def get_website_health(
     website_id: int,
-    db: Session = Depends(get_db),
+    max_age: Optional[int] = Query(None, ge=0),
+    fresh: bool = False,
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    """Get current health status of a website."""
-    website = db.query(models.Website).filter(
-        models.Website.id == website_id,
-        models.Website.owner_id == current_user.id
-    ).first()
+    """Get the latest health status of a website."""
+    website = await get_user_website(db, website_id, current_user)
     
     if not website:
         raise HTTPException(status_code=404, detail="Website not found")
     
-    health_result = await check_website_health(str(website.url))
-    return health_result
+    return await get_latest_result(
+        db, website, models.MonitoringResult,
+        ["is_up", "status_code", "response_time", "dns_time", "connect_time", "ttfb", "transfer_time", "error_message"],
+        max_age, fresh
+    )
 
 @router.get("/websites/{website_id}/ssl")
 async def get_website_ssl(
     website_id: int,
-    db: Session = Depends(get_db),
+    max_age: Optional[int] = Query(None, ge=0),
+    fresh: bool = False,
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    """Get SSL certificate status of a website."""
-    website = db.query(models.Website).filter(
-        models.Website.id == website_id,
-        models.Website.owner_id == current_user.id
-    ).first()
+    """Get the latest SSL certificate status of a website."""
+    website = await get_user_website(db, website_id, current_user)
     
     if not website:
         raise HTTPException(status_code=404, detail="Website not found")
     
-    ssl_result = await check_ssl_certificate(str(website.url))
-
-    ssl_checks = db.query(models.SSLCheck).filter(models.SSLCheck.website_id == website_id).all()
+    ssl_result = await get_latest_result(
+        db, website, models.SSLCheck,
+        ["is_valid", "expires_at", "issuer", "error_message"],
+        max_age, fresh
+    )
+    if ssl_result is None:
+        return {
+            "is_valid": False,
+            "expires_at": None,
+            "issuer": None,
+            "error_message": "Website is down"
+        }
     return ssl_result
 
 @router.get("/websites/{website_id}/security")
 async def get_website_security(
     website_id: int,
-    db: Session = Depends(get_db),
+    max_age: Optional[int] = Query(None, ge=0),
+    fresh: bool = False,
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    """Get security headers status of a website."""
-    website = db.query(models.Website).filter(
-        models.Website.id == website_id,
-        models.Website.owner_id == current_user.id
-    ).first()
+    """Get the latest security headers status of a website."""
+    website = await get_user_website(db, website_id, current_user)
     
     if not website:
         raise HTTPException(status_code=404, detail="Website not found")
     
-    security_result = await check_security_headers(str(website.url))
+    security_result = await get_latest_result(
+        db, website, models.SecurityHeader,
+        ["headers", "score", "error_message"],
+        max_age, fresh
+    )
+    if security_result is None:
+        return {
+            "headers": {},
+            "score": 0,
+            "error_message": "Website is down"
+        }
     return security_result
 
+@router.get("/websites/{website_id}/stats", response_model=List[schemas.RollupStats])
+async def get_website_stats(
+    website_id: int,
+    resolution: str = Query("hour", pattern="^(minute|hour|day)$"),
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Get aggregated uptime and response time statistics for a website."""
+    website = await get_user_website(db, website_id, current_user)
+    
+    if not website:
+        raise HTTPException(status_code=404, detail="Website not found")
+    
+    to = to or datetime.now(timezone.utc)
+    from_ = from_ or to - DEFAULT_STATS_RANGE[resolution]
+    result = await db.execute(
+        select(models.MonitoringRollup).where(
+            models.MonitoringRollup.website_id == website_id,
+            models.MonitoringRollup.resolution == resolution,
+            models.MonitoringRollup.bucket_start >= from_,
+            models.MonitoringRollup.bucket_start < to
+        ).order_by(models.MonitoringRollup.bucket_start)
+    )
+    return [summarize_rollup(rollup) for rollup in result.scalars()]
+
+@router.get("/websites/{website_id}/chart")
+async def get_website_chart_data(
+    website_id: int,
+    points: int = Query(500, ge=10, le=5000),
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Get response time and uptime series downsampled to about `points` points.
+
+    Response times are reduced with LTTB and status codes with per-bucket
+    min/max, so spikes and outages stay visible. Defaults to the last day.
+    """
+    website = await get_user_website(db, website_id, current_user)
+    
+    if not website:
+        raise HTTPException(status_code=404, detail="Website not found")
+    
+    to = to or datetime.now(timezone.utc)
+    from_ = from_ or to - timedelta(days=1)
+    result = await db.execute(
+        select(
+            models.MonitoringResult.timestamp,
+            models.MonitoringResult.response_time,
+            models.MonitoringResult.status_code,
+            models.MonitoringResult.is_up
+        ).where(
+            models.MonitoringResult.website_id == website_id,
+            models.MonitoringResult.timestamp >= from_,
+            models.MonitoringResult.timestamp < to
+        ).order_by(models.MonitoringResult.timestamp)
+    )
+    rows = result.all()
+    
+    x = [row.timestamp.timestamp() for row in rows]
+    # Down checks are stored with status 0 or >= 400, so the per-bucket extremes keep them
+    response_indices = lttb(x, [row.response_time or 0.0 for row in rows], points)
+    uptime_indices = min_max_buckets([row.status_code or 0 for row in rows], points)
+    
+    return {
+        "total_points": len(rows),
+        "response_time": [
+            {"timestamp": rows[i].timestamp, "response_time": rows[i].response_time}
+            for i in response_indices
+        ],
+        "uptime": [
+            {"timestamp": rows[i].timestamp, "status_code": rows[i].status_code, "is_up": rows[i].is_up}
+            for i in uptime_indices
+        ]
+    }
+
 @router.get("/websites/{website_id}/results", response_model=List[schemas.MonitoringResult])
 async def get_monitoring_history(
     website_id: int,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    before: Optional[datetime] = None,
+    after: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    """Get monitoring history for a website."""
-    website = db.query(models.Website).filter(
-        models.Website.id == website_id,
-        models.Website.owner_id == current_user.id
-    ).first()
+    """
+    Get monitoring history for a website, newest first.
+
+    Pass the X-Next-Cursor header of a page as `cursor` to fetch the next
+    (older) page; `before` and `after` bound the time range.
+    """
+    website = await get_user_website(db, website_id, current_user)
     
     if not website:
         raise HTTPException(status_code=404, detail="Website not found")
     
-    return db.query(models.MonitoringResult).filter(
+    query = select(models.MonitoringResult).where(
         models.MonitoringResult.website_id == website_id
-    ).order_by(models.MonitoringResult.timestamp.desc()).limit(limit).all()
\ No newline at end of file
+    )
+    if before is not None:
+        query = query.where(models.MonitoringResult.timestamp < before)
+    if after is not None:
+        query = query.where(models.MonitoringResult.timestamp > after)
+    if cursor is not None:
+        try:
+            cursor_timestamp, cursor_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(or_(
+            models.MonitoringResult.timestamp < cursor_timestamp,
+            and_(
+                models.MonitoringResult.timestamp == cursor_timestamp,
+                models.MonitoringResult.id < cursor_id
+            )
+        ))
+    
+    # One extra row tells whether there is a next page
+    result = await db.execute(
+        query.order_by(
+            models.MonitoringResult.timestamp.desc(),
+            models.MonitoringResult.id.desc()
+        ).limit(limit + 1)
+    )
+    rows = result.scalars().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].timestamp, rows[-1].id)
+    return rows
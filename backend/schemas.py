@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr, HttpUrl, Field
-from typing import Optional, List, Annotated
+from typing import Optional, List, Annotated, Dict
 from datetime import datetime
+import config
 
 # User Schemas
 class UserBase(BaseModel):
@@ -24,23 +25,52 @@ class WebsiteBase(BaseModel):
     monitoring_interval: Optional[int] = 300  # default 5 minutes
 
 class WebsiteCreate(WebsiteBase):
-    pass
+    monitoring_interval: Optional[int] = Field(300, ge=config.MIN_MONITORING_INTERVAL)  # in seconds
 
 class Website(WebsiteBase):
     id: int
     owner_id: int
     is_active: bool
     created_at: datetime
+    initial_check_status: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+class BulkImportError(BaseModel):
+    row: int  # 1-based position in the uploaded array or CSV data rows
+    error: str
+
+class BulkImportResult(BaseModel):
+    created: int
+    failed: int
+    website_ids: List[int]
+    errors: List[BulkImportError]
+
+class WebsiteSummary(BaseModel):
+    id: int
+    name: str
+    url: str
+    monitoring_interval: Optional[int] = None
+    initial_check_status: Optional[str] = None
+    last_checked_at: Optional[datetime] = None
+    is_up: Optional[bool] = None
+    status_code: Optional[int] = None
+    response_time: Optional[float] = None
+    ssl_valid: Optional[bool] = None
+    ssl_expires_at: Optional[datetime] = None
+    security_score: Optional[int] = None
+
 # Monitoring Result Schemas
 class MonitoringResultBase(BaseModel):
     response_time: float
     status_code: int
     is_up: bool
     error_message: Optional[str] = None
+    dns_time: Optional[float] = None
+    connect_time: Optional[float] = None
+    ttfb: Optional[float] = None
+    transfer_time: Optional[float] = None
 
 class MonitoringResultCreate(MonitoringResultBase):
     website_id: int
@@ -87,6 +117,17 @@ class SecurityHeader(SecurityHeaderBase):
     class Config:
         from_attributes = True
 
+# Rollup Statistics Schemas
+class RollupStats(BaseModel):
+    bucket_start: datetime
+    count: int
+    uptime_ratio: Optional[float] = None
+    mean_response_time: Optional[float] = None
+    p50_response_time: Optional[float] = None
+    p95_response_time: Optional[float] = None
+    p99_response_time: Optional[float] = None
+    status_codes: Dict[str, int]
+
 # Token Schema
 class Token(BaseModel):
     access_token: str
@@ -0,0 +1,78 @@
+"""
+Measure how long password verification stalls the event loop.
+
+Runs a burst of concurrent logins twice: verifying inline on the event
+loop (the old behaviour) and on the password hashing pool. A ticker task
+wakes every few milliseconds and records how late it was woken, which is
+the delay every other request and probe would have seen.
+
+Usage (from the backend directory):
+    python scripts/bench_password_hashing.py --logins 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from utils.security import get_password_hash, verify_password, verify_and_update_password  # noqa: E402
+
+TICK_SECONDS = 0.005
+
+async def ticker(lateness: list, stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + TICK_SECONDS
+        await asyncio.sleep(TICK_SECONDS)
+        lateness.append(max(0.0, loop.time() - expected))
+
+async def blocking_login(password: str, hashed: str) -> None:
+    verify_password(password, hashed)
+
+async def offloaded_login(password: str, hashed: str) -> None:
+    await verify_and_update_password(password, hashed)
+
+async def measure(login, logins: int, password: str, hashed: str) -> dict:
+    lateness = []
+    stop = asyncio.Event()
+    tick_task = asyncio.create_task(ticker(lateness, stop))
+    await asyncio.sleep(TICK_SECONDS * 2)
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(login(password, hashed) for _ in range(logins)))
+    duration = time.perf_counter() - start_time
+
+    stop.set()
+    await tick_task
+    lateness.sort()
+    return {
+        "duration": duration,
+        "max_stall": lateness[-1],
+        "p99_stall": lateness[min(len(lateness) - 1, int(len(lateness) * 0.99))],
+        "mean_stall": statistics.mean(lateness),
+    }
+
+def report(name: str, result: dict) -> None:
+    print(
+        f"{name:<10} total {result['duration'] * 1000:8.1f} ms | "
+        f"loop stall max {result['max_stall'] * 1000:8.1f} ms, "
+        f"p99 {result['p99_stall'] * 1000:8.1f} ms, "
+        f"mean {result['mean_stall'] * 1000:6.2f} ms"
+    )
+
+async def main(logins: int) -> None:
+    password = "correct horse battery staple"
+    hashed = get_password_hash(password)
+    print(f"bcrypt rounds: {config.BCRYPT_ROUNDS}, concurrent logins: {logins}")
+    report("inline", await measure(blocking_login, logins, password, hashed))
+    report("offloaded", await measure(offloaded_login, logins, password, hashed))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=20, help="number of concurrent logins")
+    args = parser.parse_args()
+    asyncio.run(main(args.logins))
@@ -0,0 +1,191 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Tuple
+from sqlalchemy import bindparam, delete, func, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+import models
+import config
+from database import AsyncSessionLocal
+from services.scheduler import next_phase_slot
+from utils.timestamps import as_utc
+from utils.urls import normalize_url
+
+# Checks shared between worker processes through the check_queue table.
+# A worker leases due entries, renews the lease while the checks run and
+# releases them with their next due time; the lease of a crashed worker
+# expires and its checks are claimed again.
+
+QUEUE = models.CheckQueueEntry.__table__
+
+def _unleased(now: datetime):
+    return or_(QUEUE.c.lease_expires_at.is_(None), QUEUE.c.lease_expires_at < now)
+
+def _insert_ignore(db: AsyncSession):
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(QUEUE).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(QUEUE).on_conflict_do_nothing()
+    return insert(QUEUE)
+
+async def enqueue_checks(db: AsyncSession, checks: Iterable[Tuple[int, float]]) -> None:
+    """
+    Queue websites for checking after the given delays in seconds.
+
+    Websites already in the queue keep their entry.
+    """
+    now = datetime.now(timezone.utc)
+    rows = [{"website_id": website_id, "due_at": now + timedelta(seconds=delay)} for website_id, delay in checks]
+    if rows:
+        await db.execute(_insert_ignore(db), rows)
+        await db.commit()
+
+async def sync_queue() -> None:
+    """
+    Add active websites missing from the queue and remove inactive ones.
+
+    Added websites are first due in their phase slot.
+    """
+    async with AsyncSessionLocal() as db:
+        missing = select(models.Website.id, models.Website.url, models.Website.monitoring_interval).where(
+            models.Website.is_active == True,
+            models.Website.id.not_in(select(QUEUE.c.website_id))
+        )
+        result = await db.execute(missing)
+        now = time.time()
+        await enqueue_checks(db, [
+            (row.id, next_phase_slot(normalize_url(row.url), row.monitoring_interval or 300, now) - now)
+            for row in result.all()
+        ])
+
+        await db.execute(delete(QUEUE).where(
+            QUEUE.c.website_id.not_in(select(models.Website.id).where(models.Website.is_active == True))
+        ))
+        await db.commit()
+
+async def claim_checks(
+    worker_id: str,
+    limit: int = config.QUEUE_CLAIM_BATCH_SIZE,
+    lease_seconds: float = config.QUEUE_LEASE_SECONDS
+) -> List[Dict[str, Any]]:
+    """
+    Lease up to limit due checks for a worker.
+
+    Postgres skips rows locked by other workers' claims. The update is
+    also conditional on the entry still being unleased, so concurrent
+    claims on SQLite (which has no row locks) cannot both win. Returns
+    the website id, URL, interval and due time of each claimed check.
+    """
+    now = datetime.now(timezone.utc)
+    unleased = _unleased(now)
+    async with AsyncSessionLocal() as db:
+        candidates = await db.execute(
+            select(QUEUE.c.website_id).where(QUEUE.c.due_at <= now, unleased).order_by(
+                QUEUE.c.due_at
+            ).limit(limit).with_for_update(skip_locked=True)
+        )
+        candidate_ids = candidates.scalars().all()
+        if not candidate_ids:
+            await db.commit()
+            return []
+
+        claimed = await db.execute(
+            update(QUEUE).where(QUEUE.c.website_id.in_(candidate_ids), unleased).values(
+                leased_by=worker_id,
+                lease_expires_at=now + timedelta(seconds=lease_seconds)
+            ).returning(QUEUE.c.website_id)
+        )
+        claimed_ids = claimed.scalars().all()
+        await db.commit()
+        if not claimed_ids:
+            return []
+
+        result = await db.execute(
+            select(
+                QUEUE.c.website_id,
+                QUEUE.c.due_at,
+                models.Website.url,
+                models.Website.monitoring_interval
+            ).join(models.Website, models.Website.id == QUEUE.c.website_id).where(
+                QUEUE.c.website_id.in_(claimed_ids)
+            )
+        )
+        checks = [
+            {
+                "website_id": row.website_id,
+                "due_at": as_utc(row.due_at),
+                "url": row.url,
+                "interval": row.monitoring_interval or 300,
+            }
+            for row in result
+        ]
+        await db.commit()
+        return checks
+
+async def renew_leases(
+    worker_id: str,
+    website_ids: Iterable[int],
+    lease_seconds: float = config.QUEUE_LEASE_SECONDS
+) -> None:
+    """Extend the leases a worker holds on running checks."""
+    website_ids = list(website_ids)
+    if not website_ids:
+        return
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(QUEUE).where(
+                QUEUE.c.website_id.in_(website_ids),
+                QUEUE.c.leased_by == worker_id
+            ).values(lease_expires_at=datetime.now(timezone.utc) + timedelta(seconds=lease_seconds))
+        )
+        await db.commit()
+
+async def release_checks(worker_id: str, checks: Iterable[Dict[str, Any]]) -> None:
+    """
+    Release finished checks and set their next due time.
+
+    Checks move to their next phase slot, skipping slots they fell behind
+    on. Leases that expired and were claimed by another worker in the
+    meantime are left alone.
+    """
+    now = datetime.now(timezone.utc)
+    rows = []
+    for check in checks:
+        after = max(check["due_at"], now).timestamp()
+        next_due = next_phase_slot(normalize_url(str(check["url"])), check["interval"], after)
+        rows.append({"b_website_id": check["website_id"], "b_due_at": datetime.fromtimestamp(next_due, timezone.utc)})
+    if not rows:
+        return
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(QUEUE).where(
+                QUEUE.c.website_id == bindparam("b_website_id"),
+                QUEUE.c.leased_by == worker_id
+            ).values(
+                due_at=bindparam("b_due_at"),
+                leased_by=None,
+                lease_expires_at=None,
+                last_run_at=now
+            ),
+            rows
+        )
+        await db.commit()
+
+async def queue_stats() -> Dict[str, Any]:
+    """
+    Report due and leased checks, and how long the oldest due check has
+    been waiting for a worker.
+    """
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(func.count(), func.min(QUEUE.c.due_at)).where(QUEUE.c.due_at <= now, _unleased(now))
+        )
+        due_checks, oldest_due = result.one()
+        leased_checks = await db.scalar(select(func.count()).where(QUEUE.c.lease_expires_at >= now))
+    return {
+        "due_checks": due_checks,
+        "leased_checks": leased_checks,
+        "lag_seconds": (now - as_utc(oldest_due)).total_seconds() if oldest_due else 0.0,
+    }
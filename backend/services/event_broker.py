@@ -0,0 +1,93 @@
+import asyncio
+from typing import Any, Dict, Iterable, Optional, Set
+import config
+
+class Subscription:
+    """
+    A subscriber's bounded queue of events for a set of websites.
+
+    When the queue is full the oldest event is dropped; the subscriber
+    is told how many it missed with a "lagged" event.
+    """
+
+    def __init__(self, website_ids: Set[int], queue_size: int):
+        self.website_ids = website_ids
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._dropped = 0
+
+    def put(self, event: Dict[str, Any]) -> None:
+        if self._queue.full():
+            self._queue.get_nowait()
+            self._dropped += 1
+        self._queue.put_nowait(event)
+
+    async def get(self) -> Dict[str, Any]:
+        """Wait for the next event."""
+        if self._dropped:
+            dropped, self._dropped = self._dropped, 0
+            return {"type": "lagged", "data": {"dropped_events": dropped}}
+        return await self._queue.get()
+
+class EventBroker:
+    """
+    In-process pub/sub for check results written by the monitoring pipeline.
+
+    Publishes a "result" event for every stored MonitoringResult and a
+    "state_change" event when a website goes up or down.
+    """
+
+    def __init__(self, queue_size: int = config.EVENT_QUEUE_SIZE):
+        self._queue_size = queue_size
+        self._subscriptions: Set[Subscription] = set()
+        self._last_is_up: Dict[int, bool] = {}  # website_id -> latest is_up
+        # Set while the event relay publishes every result from the database
+        self.relayed = False
+
+    def subscribe(self, website_ids: Iterable[int]) -> Subscription:
+        """Start receiving events for the given websites."""
+        subscription = Subscription(set(website_ids), self._queue_size)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Stop receiving events."""
+        self._subscriptions.discard(subscription)
+
+    def _publish(self, website_id: int, event: Dict[str, Any]) -> None:
+        for subscription in self._subscriptions:
+            if website_id in subscription.website_ids:
+                subscription.put(event)
+
+    def publish_results(self, rows: Iterable[Dict[str, Any]], relayed: bool = False) -> None:
+        """
+        Publish stored MonitoringResult rows.
+
+        While the relay is running only rows it read back are published,
+        so results written by this process are not sent twice.
+        """
+        if self.relayed and not relayed:
+            return
+        for row in rows:
+            website_id = row["website_id"]
+            self._publish(website_id, {"type": "result", "data": row})
+
+            previous: Optional[bool] = self._last_is_up.get(website_id)
+            self._last_is_up[website_id] = row["is_up"]
+            if previous is not None and previous != row["is_up"]:
+                self._publish(website_id, {
+                    "type": "state_change",
+                    "data": {
+                        "website_id": website_id,
+                        "timestamp": row["timestamp"],
+                        "is_up": row["is_up"],
+                        "status_code": row["status_code"],
+                        "error_message": row.get("error_message"),
+                    }
+                })
+
+    def stats(self) -> Dict[str, Any]:
+        """Report the number of connected subscribers."""
+        return {"subscribers": len(self._subscriptions)}
+
+# Shared broker; it has no background work, so it needs no lifespan hooks
+event_broker = EventBroker()
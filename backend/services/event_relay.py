@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func, select
+import models
+import config
+from database import AsyncSessionLocal
+from services.event_broker import event_broker
+from utils.timestamps import as_utc
+
+logger = logging.getLogger(__name__)
+
+# Results written by other processes (worker.py in queue mode, first
+# checks stored by probe processes) never pass through the API process's
+# broker, so the API process learns about them by polling for MonitoringResult rows newer
+# than the last one it published. A row whose transaction commits after
+# one with a higher id was relayed is missed; the stream is best effort.
+
+RESULTS = models.MonitoringResult.__table__
+
+async def _newer_results(last_id: int, limit: int) -> List[Dict[str, Any]]:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(RESULTS).where(RESULTS.c.id > last_id).order_by(RESULTS.c.id).limit(limit)
+        )
+        return [{key: as_utc(value) for key, value in row._mapping.items()} for row in result]
+
+async def _latest_result_id() -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(func.max(RESULTS.c.id))) or 0
+
+async def _run_relay(interval: float, batch_size: int) -> None:
+    last_id: Optional[int] = None
+    while True:
+        try:
+            if not event_broker.stats()["subscribers"]:
+                # Nobody is listening; start from the newest row once someone is
+                last_id = None
+            elif last_id is None:
+                last_id = await _latest_result_id()
+            else:
+                rows = await _newer_results(last_id, batch_size)
+                if rows:
+                    last_id = rows[-1]["id"]
+                    # Same shape as the rows published by the result writers
+                    event_broker.publish_results(
+                        [{key: value for key, value in row.items() if key != "id"} for row in rows],
+                        relayed=True
+                    )
+                    if len(rows) == batch_size:
+                        continue
+        except Exception as e:
+            logger.error(f"Error relaying results to event subscribers: {str(e)}")
+        await asyncio.sleep(interval)
+
+_task: Optional[asyncio.Task] = None
+
+async def start_event_relay(
+    interval: float = config.EVENT_RELAY_INTERVAL,
+    batch_size: int = config.EVENT_RELAY_BATCH_SIZE
+) -> None:
+    """
+    Start publishing results written by other processes (called from the
+    app lifespan in queue mode or with probe processes).
+
+    Local writes are no longer published directly, so every result is
+    published once, by the relay.
+    """
+    global _task
+    if _task is None:
+        event_broker.relayed = True
+        _task = asyncio.create_task(_run_relay(interval, batch_size))
+        logger.info("Started event relay")
+
+async def stop_event_relay() -> None:
+    """
+    Stop the event relay.
+    """
+    global _task
+    if _task is not None:
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+        event_broker.relayed = False
+        logger.info("Stopped event relay")
+    _task = None
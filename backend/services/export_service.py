@@ -0,0 +1,137 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List
+from sqlalchemy import Boolean, DateTime, Float, Integer, JSON, select
+import models
+import config
+from database import AsyncSessionLocal
+from utils.timestamps import as_utc
+
+EXPORT_MODELS = {
+    "results": models.MonitoringResult,
+    "ssl": models.SSLCheck,
+    "security": models.SecurityHeader,
+}
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+async def _fetch_batches(query, batch_size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Run a query on a server-side cursor and yield its rows in batches.
+
+    Uses its own session because the response body is streamed after the
+    request's dependencies have been cleaned up.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        async for partition in result.mappings().partitions(batch_size):
+            yield [dict(row) for row in partition]
+
+def _json_default(value: Any) -> Any:
+    # Same ISO 8601 UTC timestamps as the CSV and Arrow exports
+    if isinstance(value, datetime):
+        return as_utc(value).isoformat()
+    return str(value)
+
+def _to_text(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return as_utc(value).isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+async def _ndjson(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield "".join(json.dumps(row, default=_json_default) + "\n" for row in batch).encode()
+
+async def _csv(batches: AsyncIterator[List[Dict[str, Any]]], columns: List[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode()
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_to_text(row[column]) for column in columns] for row in batch)
+        yield buffer.getvalue().encode()
+
+def _arrow_schema(model):
+    import pyarrow as pa
+
+    fields = []
+    for column in model.__table__.columns:
+        if isinstance(column.type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column.type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column.type, Float):
+            arrow_type = pa.float64()
+        elif isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp("us", tz="UTC")
+        else:
+            arrow_type = pa.string()  # strings, and JSON serialized as text
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+async def _arrow(batches: AsyncIterator[List[Dict[str, Any]]], model) -> AsyncIterator[bytes]:
+    import pyarrow as pa
+
+    schema = _arrow_schema(model)
+    json_columns = [column.name for column in model.__table__.columns if isinstance(column.type, JSON)]
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        async for batch in batches:
+            for row in batch:
+                for column in json_columns:
+                    row[column] = json.dumps(row[column]) if row[column] is not None else None
+            writer.write_batch(pa.RecordBatch.from_pylist(
+                [{key: as_utc(value) for key, value in row.items()} for row in batch],
+                schema=schema
+            ))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()
+
+def arrow_available() -> bool:
+    """Whether the optional pyarrow dependency for columnar exports is installed."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def export_history(
+    kind: str,
+    export_format: str,
+    website_ids_query,
+    start: datetime = None,
+    end: datetime = None,
+    batch_size: int = config.EXPORT_BATCH_SIZE
+) -> AsyncIterator[bytes]:
+    """
+    Stream the history of one result table as NDJSON, CSV or Arrow IPC.
+
+    Memory use is bounded by batch_size whatever the date range.
+    """
+    model = EXPORT_MODELS[kind]
+    columns = [column.name for column in model.__table__.columns]
+    query = select(*model.__table__.columns).where(model.website_id.in_(website_ids_query))
+    if start is not None:
+        query = query.where(model.timestamp >= start)
+    if end is not None:
+        query = query.where(model.timestamp < end)
+    query = query.order_by(model.website_id, model.timestamp, model.id)
+
+    batches = _fetch_batches(query, batch_size)
+    if export_format == "arrow":
+        return _arrow(batches, model)
+    if export_format == "csv":
+        return _csv(batches, columns)
+    return _ndjson(batches)
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+import config
+
+class _HostState:
+    def __init__(self, max_concurrency: int, burst: float):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.active = 0
+
+class HostLimiter:
+    """
+    Limit concurrent requests and request rate per target host.
+
+    Each host gets a semaphore of max_concurrency slots and a token bucket
+    refilled at rate tokens per second up to burst. A rate of 0 disables
+    the rate limit.
+    """
+
+    # Idle hosts are forgotten once this many new hosts have been seen
+    PRUNE_EVERY = 1000
+
+    def __init__(
+        self,
+        max_concurrency: int = config.HOST_MAX_CONCURRENCY,
+        rate: float = config.HOST_RATE_PER_SEC,
+        burst: float = config.HOST_BURST
+    ):
+        self._max_concurrency = max_concurrency
+        self._rate = rate
+        self._burst = max(burst, 1.0)
+        self._hosts: Dict[str, _HostState] = {}
+        self._new_hosts = 0
+        self._waits = 0
+        self._wait_seconds = 0.0
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            self._new_hosts += 1
+            if self._new_hosts % self.PRUNE_EVERY == 0:
+                self._prune()
+            state = self._hosts[host] = _HostState(self._max_concurrency, self._burst)
+        return state
+
+    def _refill(self, state: _HostState) -> None:
+        now = time.monotonic()
+        state.tokens = min(self._burst, state.tokens + (now - state.updated) * self._rate)
+        state.updated = now
+
+    def _prune(self) -> None:
+        # A host with nothing in flight and a full bucket is the same as a new one
+        for host, state in list(self._hosts.items()):
+            if state.active == 0:
+                self._refill(state)
+                if state.tokens >= self._burst:
+                    del self._hosts[host]
+
+    async def _take_token(self, state: _HostState) -> None:
+        while True:
+            self._refill(state)
+            if state.tokens >= 1:
+                state.tokens -= 1
+                return
+            await asyncio.sleep((1 - state.tokens) / self._rate)
+
+    @asynccontextmanager
+    async def limit(self, host: Optional[str]) -> AsyncIterator[None]:
+        """Wait for a slot and a token for host, holding the slot until exit."""
+        if not host:
+            yield
+            return
+        state = self._state(host.lower())
+        start_time = time.monotonic()
+        state.active += 1
+        try:
+            async with state.semaphore:
+                if self._rate > 0:
+                    await self._take_token(state)
+                waited = time.monotonic() - start_time
+                if waited > 0.001:
+                    self._waits += 1
+                    self._wait_seconds += waited
+                yield
+        finally:
+            state.active -= 1
+
+    def stats(self) -> Dict[str, float]:
+        """Report tracked hosts and how often requests had to wait."""
+        return {
+            "tracked_hosts": len(self._hosts),
+            "waits": self._waits,
+            "wait_seconds": self._wait_seconds,
+        }
+
+_limiter: Optional[HostLimiter] = None
+
+def get_host_limiter() -> HostLimiter:
+    """
+    Return the shared host limiter, creating it lazily.
+    """
+    global _limiter
+    if _limiter is None:
+        _limiter = HostLimiter()
+    return _limiter
@@ -0,0 +1,155 @@
+import aiohttp
+import logging
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+import config
+
+logger = logging.getLogger(__name__)
+
+_session: Optional[aiohttp.ClientSession] = None
+
+# Phase timings are recorded into a dict passed as the request's
+# trace_request_ctx; requests made without one are not timed. Redirect
+# hops are summed. aiohttp has no separate TLS hook, so connect_time
+# covers the TCP connect and the TLS handshake.
+
+def _timings(params_ctx: SimpleNamespace) -> Optional[Dict[str, Any]]:
+    return params_ctx.trace_request_ctx if isinstance(params_ctx.trace_request_ctx, dict) else None
+
+async def _on_request_start(session, params_ctx, params) -> None:
+    timings = _timings(params_ctx)
+    if timings is not None:
+        timings.setdefault("dns_time", 0.0)
+        timings.setdefault("connect_time", 0.0)
+        timings.setdefault("ttfb", 0.0)
+        timings["_hop_start"] = time.perf_counter()
+        timings["_hop_setup"] = 0.0  # pool wait, DNS and connect within this hop
+        timings["_hop_dns"] = 0.0
+
+async def _on_phase_start(session, params_ctx, params) -> None:
+    timings = _timings(params_ctx)
+    if timings is not None:
+        timings["_phase_start"] = time.perf_counter()
+
+async def _on_connection_queued_end(session, params_ctx, params) -> None:
+    timings = _timings(params_ctx)
+    if timings is not None:
+        timings["_hop_setup"] += time.perf_counter() - timings["_phase_start"]
+
+async def _on_dns_resolvehost_start(session, params_ctx, params) -> None:
+    timings = _timings(params_ctx)
+    if timings is not None:
+        timings["_dns_start"] = time.perf_counter()
+
+async def _on_dns_resolvehost_end(session, params_ctx, params) -> None:
+    timings = _timings(params_ctx)
+    if timings is not None:
+        elapsed = time.perf_counter() - timings["_dns_start"]
+        timings["dns_time"] += elapsed
+        timings["_hop_dns"] += elapsed
+
+async def _on_connection_create_end(session, params_ctx, params) -> None:
+    timings = _timings(params_ctx)
+    if timings is not None:
+        # Host resolution happens inside connection creation
+        elapsed = time.perf_counter() - timings["_phase_start"]
+        timings["connect_time"] += elapsed - timings["_hop_dns"]
+        timings["_hop_setup"] += elapsed
+
+async def _on_response_headers(session, params_ctx, params) -> None:
+    timings = _timings(params_ctx)
+    if timings is not None and "_hop_start" in timings:
+        timings["ttfb"] += time.perf_counter() - timings.pop("_hop_start") - timings["_hop_setup"]
+
+def _create_trace_config() -> aiohttp.TraceConfig:
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_connection_queued_start.append(_on_phase_start)
+    trace_config.on_connection_queued_end.append(_on_connection_queued_end)
+    trace_config.on_connection_create_start.append(_on_phase_start)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_dns_resolvehost_start.append(_on_dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(_on_dns_resolvehost_end)
+    trace_config.on_request_redirect.append(_on_response_headers)
+    trace_config.on_request_end.append(_on_response_headers)
+    return trace_config
+
+def phase_timings(timings: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """
+    Return the dns_time, connect_time and ttfb recorded for a request, in seconds.
+
+    Reused connections report zero DNS and connect time.
+    """
+    return {key: timings.get(key) for key in ("dns_time", "connect_time", "ttfb")}
+
+class TLSResponse(aiohttp.ClientResponse):
+    """
+    Response that keeps the peer certificate of the TLS session it was
+    read from.
+
+    A small body arrives with the headers, and aiohttp then releases the
+    connection before the caller sees the response, so the certificate
+    is captured while the connection is still held.
+    """
+
+    peer_certificate: Optional[Dict[str, Any]] = None
+
+    async def start(self, connection) -> "TLSResponse":
+        transport = connection.transport
+        ssl_object = transport.get_extra_info("ssl_object") if transport is not None else None
+        if ssl_object is not None:
+            self.peer_certificate = ssl_object.getpeercert() or None
+        return await super().start(connection)
+
+def _create_session() -> aiohttp.ClientSession:
+    """
+    Build the pooled client session shared by every probe.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=config.HTTP_MAX_CONNECTIONS,
+        limit_per_host=config.HTTP_MAX_CONNECTIONS_PER_HOST,
+        keepalive_timeout=config.HTTP_KEEPALIVE_TIMEOUT,
+        use_dns_cache=True,
+        ttl_dns_cache=config.HTTP_DNS_CACHE_TTL,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=config.HTTP_TOTAL_TIMEOUT,
+        connect=config.HTTP_CONNECT_TIMEOUT,
+        sock_read=config.HTTP_READ_TIMEOUT,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        trace_configs=[_create_trace_config()],
+        response_class=TLSResponse
+    )
+
+async def start_http_client() -> aiohttp.ClientSession:
+    """
+    Create the shared client session (called from the app lifespan).
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = _create_session()
+        logger.info("Started shared HTTP client")
+    return _session
+
+def get_http_client() -> aiohttp.ClientSession:
+    """
+    Return the shared client session, creating it lazily if needed.
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = _create_session()
+    return _session
+
+async def close_http_client() -> None:
+    """
+    Close the shared client session and its pooled connections.
+    """
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+        logger.info("Closed shared HTTP client")
+    _session = None
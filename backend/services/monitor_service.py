@@ -1,64 +1,145 @@
 import aiohttp
 import asyncio
 import ssl
-import socket
-from datetime import datetime
-from typing import Dict, Any, Tuple
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Mapping, Optional, Tuple, Type
 import OpenSSL
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 import models
 from urllib.parse import urlparse
 import logging
+from database import AsyncSessionLocal
+from services.http_client import get_http_client, phase_timings
+from services.host_limiter import get_host_limiter
+from services.worker_pool import CheckWorkerPool
+from services.result_sink import get_result_sink
+from services.rollup_service import apply_results
+from services.event_broker import event_broker
+from utils.singleflight import SingleFlight
+from utils.urls import normalize_url
+import config
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def check_website_health(url: str) -> Dict[str, Any]:
+# Loading the CA bundle is expensive, so every certificate check shares one context
+_ssl_context = ssl.create_default_context()
+_tls_semaphore: Optional[asyncio.Semaphore] = None
+_refreshes = SingleFlight()
+
+async def _read_body(response: aiohttp.ClientResponse, max_bytes: int = config.PROBE_BODY_MAX_BYTES) -> Optional[float]:
     """
-    Check website health including response time and status code.
+    Read and discard up to max_bytes of a response body, returning how
+    long that took.
+
+    A longer body is cut off and its connection closed rather than
+    downloaded while the host's slot is held. Returns None when body
+    timing is disabled (max_bytes of 0) or the body could not be read.
     """
+    if max_bytes <= 0:
+        return None
+    start_time = time.perf_counter()
+    received = 0
     try:
-        async with aiohttp.ClientSession() as session:
-            start_time = datetime.now()
-            async with session.get(url, timeout=30) as response:
-                end_time = datetime.now()
-                response_time = (end_time - start_time).total_seconds()
-                
-                return {
-                    "is_up": response.status < 400,
-                    "status_code": response.status,
-                    "response_time": response_time,
-                    "error_message": None
-                }
-    except Exception as e:
-        return {
-            "is_up": False,
-            "status_code": 0,
-            "response_time": 0,
-            "error_message": str(e)
-        }
+        while received < max_bytes:
+            chunk = await response.content.read(min(65536, max_bytes - received))
+            if not chunk:
+                break
+            received += len(chunk)
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return None
+    transfer_time = time.perf_counter() - start_time
+    if not response.content.at_eof():
+        # The rest of the body is never read, so the connection cannot be reused
+        response.close()
+    return transfer_time
+
+SECURITY_HEADERS = {
+    'Strict-Transport-Security': 10,
+    'Content-Security-Policy': 10,
+    'X-Frame-Options': 10,
+    'X-Content-Type-Options': 10,
+    'Referrer-Policy': 10,
+    'Permissions-Policy': 10,
+    'X-XSS-Protection': 5,
+}
 
-async def check_ssl_certificate(url: str) -> Dict[str, Any]:
+def parse_certificate(cert: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract expiry and issuer from a certificate returned by getpeercert().
+    """
+    not_after = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
+    issuer = dict(x[0] for x in cert['issuer'])
+    
+    return {
+        "is_valid": True,
+        "expires_at": not_after,
+        "issuer": issuer.get('organizationName', 'Unknown'),
+        "error_message": None
+    }
+
+def score_security_headers(headers: Mapping[str, str]) -> Dict[str, Any]:
+    """
+    Calculate security score from response headers.
+    """
+    score = 0
+    found_headers = {}
+    
+    for header, points in SECURITY_HEADERS.items():
+        if header in headers:
+            score += points
+            found_headers[header] = headers[header]
+    
+    return {
+        "headers": found_headers,
+        "score": score,
+        "error_message": None
+    }
+
+def _get_tls_semaphore() -> asyncio.Semaphore:
+    """
+    Return the semaphore bounding concurrent certificate checks.
+    """
+    global _tls_semaphore
+    if _tls_semaphore is None:
+        _tls_semaphore = asyncio.Semaphore(config.TLS_CHECK_CONCURRENCY)
+    return _tls_semaphore
+
+async def check_ssl_certificate(url: str, timeout: float = config.TLS_CHECK_TIMEOUT) -> Dict[str, Any]:
     """
     Check SSL certificate validity and details.
+
+    Connects and handshakes on the event loop without blocking it; the
+    timeout covers both steps. The port is taken from https URLs and
+    defaults to 443.
     """
+    parsed = urlparse(url)
+    hostname = parsed.hostname
+    port = (parsed.port if parsed.scheme == "https" else None) or 443
+    writer = None
     try:
-        hostname = urlparse(url).hostname
-        context = ssl.create_default_context()
-        
-        with socket.create_connection((hostname, 443)) as sock:
-            with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                cert = ssock.getpeercert()
-                
-                not_after = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
-                issuer = dict(x[0] for x in cert['issuer'])
-                
-                return {
-                    "is_valid": True,
-                    "expires_at": not_after,
-                    "issuer": issuer.get('organizationName', 'Unknown'),
-                    "error_message": None
-                }
+        # Wait for the host's limit before taking one of the shared TLS slots
+        async with get_host_limiter().limit(hostname), _get_tls_semaphore():
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(
+                    hostname,
+                    port,
+                    ssl=_ssl_context,
+                    server_hostname=hostname,
+                    ssl_handshake_timeout=timeout
+                ),
+                timeout=timeout
+            )
+            return parse_certificate(writer.get_extra_info("peercert"))
+    except asyncio.TimeoutError:
+        return {
+            "is_valid": False,
+            "expires_at": None,
+            "issuer": None,
+            "error_message": f"Timed out after {timeout}s connecting to {hostname}:{port}"
+        }
     except Exception as e:
         return {
             "is_valid": False,
@@ -66,91 +147,240 @@ async def check_ssl_certificate(url: str) -> Dict[str, Any]:
             "issuer": None,
             "error_message": str(e)
         }
+    finally:
+        if writer is not None:
+            writer.close()
 
-async def check_security_headers(url: str) -> Dict[str, Any]:
+def _peer_certificate(url: str, response: aiohttp.ClientResponse) -> Optional[Dict[str, Any]]:
     """
-    Check security headers and calculate security score.
+    Return the peer certificate of the TLS session that served a response.
+
+    Returns None when the response was not served over TLS for the
+    requested host (plain HTTP, redirect to another host) or did not come
+    from the shared client, which records the certificate.
+    """
+    if response.url.host != urlparse(url).hostname:
+        return None
+    return getattr(response, "peer_certificate", None)
+
+async def probe_website(url: str) -> Dict[str, Any]:
+    """
+    Check health, SSL certificate and security headers with one request.
+
+    The certificate is read from the TLS session of the health request;
+    a separate certificate check is only made when that session is not
+    available. SSL and security results are None when the site is down.
     """
-    security_headers = {
-        'Strict-Transport-Security': 10,
-        'Content-Security-Policy': 10,
-        'X-Frame-Options': 10,
-        'X-Content-Type-Options': 10,
-        'Referrer-Policy': 10,
-        'Permissions-Policy': 10,
-        'X-XSS-Protection': 5,
-    }
-    
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                headers = response.headers
-                score = 0
-                found_headers = {}
-                
-                for header, points in security_headers.items():
-                    if header in headers:
-                        score += points
-                        found_headers[header] = headers[header]
-                
-                return {
-                    "headers": found_headers,
-                    "score": score,
+        session = get_http_client()
+        timings = {}
+        # Time spent waiting for the host's limit is not part of the response time
+        async with get_host_limiter().limit(urlparse(url).hostname):
+            start_time = time.perf_counter()
+            async with session.get(url, trace_request_ctx=timings) as response:
+                health_result = {
+                    "is_up": response.status < 400,
+                    "status_code": response.status,
+                    "response_time": time.perf_counter() - start_time,
+                    **phase_timings(timings),
                     "error_message": None
                 }
+                cert = _peer_certificate(url, response)
+                security_result = score_security_headers(response.headers)
+                health_result["transfer_time"] = await _read_body(response)
     except Exception as e:
         return {
-            "headers": {},
-            "score": 0,
-            "error_message": str(e)
+            "health": {
+                "is_up": False,
+                "status_code": 0,
+                "response_time": 0,
+                "error_message": str(e)
+            },
+            "ssl": None,
+            "security": None
         }
+    
+    if not health_result["is_up"]:
+        return {"health": health_result, "ssl": None, "security": None}
+    
+    if cert:
+        try:
+            ssl_result = parse_certificate(cert)
+        except Exception as e:
+            ssl_result = {
+                "is_valid": False,
+                "expires_at": None,
+                "issuer": None,
+                "error_message": str(e)
+            }
+    else:
+        ssl_result = await check_ssl_certificate(url)
+    
+    return {"health": health_result, "ssl": ssl_result, "security": security_result}
+
+def build_result_rows(website_id: int, probe_result: Dict[str, Any], timestamp: datetime) -> List[Tuple[Type[models.Base], Dict[str, Any]]]:
+    """
+    Turn a probe result into (model, row) pairs ready for insertion.
+    """
+    health_result = probe_result["health"]
+    rows = [(models.MonitoringResult, {
+        "website_id": website_id,
+        "timestamp": timestamp,
+        **{key: health_result[key] for key in ['is_up', 'status_code', 'response_time', 'error_message']},
+        # Phase timings are missing when the request failed
+        **{key: health_result.get(key) for key in ['dns_time', 'connect_time', 'ttfb', 'transfer_time']}
+    })]
+    
+    # SSL and security headers are only stored if website is up
+    if health_result["is_up"]:
+        ssl_result = probe_result["ssl"]
+        rows.append((models.SSLCheck, {
+            "website_id": website_id,
+            "timestamp": timestamp,
+            "is_valid": ssl_result["is_valid"],
+            "expires_at": ssl_result["expires_at"],
+            "issuer": ssl_result["issuer"],
+            "error_message": ssl_result["error_message"]
+        }))
+        
+        security_result = probe_result["security"]
+        rows.append((models.SecurityHeader, {
+            "website_id": website_id,
+            "timestamp": timestamp,
+            "headers": security_result["headers"],
+            "score": security_result["score"],
+            "error_message": security_result.get("error_message", None)  # Include error_message safely
+        }))
+    
+    return rows
+
+async def store_result_rows(db: AsyncSession, rows: List[Tuple[Type[models.Base], Dict[str, Any]]]) -> None:
+    """
+    Insert result rows, update the rollups and commit.
+    """
+    for model, row in rows:
+        db.add(model(**row))
+    results = [row for model, row in rows if model is models.MonitoringResult]
+    await apply_results(db, results)
+    await db.commit()
+    event_broker.publish_results(results)
+
+async def refresh_website(website: models.Website) -> Dict[Type[models.Base], Dict[str, Any]]:
+    """
+    Probe a website now and store the results.
 
-async def monitor_website(db: Session, website: models.Website) -> None:
+    Concurrent refreshes of the same website share a single probe. Returns
+    the stored rows keyed by model.
+    """
+    website_id, url = website.id, str(website.url)
+    
+    async def probe_and_store() -> Dict[Type[models.Base], Dict[str, Any]]:
+        probe_result = await probe_website(url)
+        rows = build_result_rows(website_id, probe_result, datetime.now(timezone.utc))
+        async with AsyncSessionLocal() as db:
+            await store_result_rows(db, rows)
+        return dict(rows)
+    
+    return await _refreshes.do(website_id, probe_and_store)
+
+async def monitor_website(db: AsyncSession, website: models.Website) -> None:
     """
     Monitor a website and store results in database.
+
+    The rows are committed before returning.
     """
     try:
-        # Check basic health
-        health_result = await check_website_health(str(website.url))
-        monitoring_result = models.MonitoringResult(
-            website_id=website.id,
-            **{key: health_result[key] for key in ['is_up', 'status_code', 'response_time']}  # Only include valid fields
-        )
-        db.add(monitoring_result)
-        
-        # Check SSL if website is up
-        if health_result["is_up"]:
-            ssl_result = await check_ssl_certificate(str(website.url))
-            ssl_check = models.SSLCheck(
-                website_id=website.id,
-                is_valid=ssl_result["is_valid"],
-                expires_at=ssl_result["expires_at"],
-                issuer=ssl_result["issuer"],
-                error_message=ssl_result["error_message"]
-            )
-            db.add(ssl_check)
-            
-            # Check security headers
-            security_result = await check_security_headers(str(website.url))
-            security_header = models.SecurityHeader(
-                website_id=website.id,
-                headers=security_result["headers"],
-                score=security_result["score"],
-                error_message=security_result.get("error_message", None)  # Include error_message safely
-            )
-            db.add(security_header)
-        
-        db.commit()
+        probe_result = await probe_website(str(website.url))
+        rows = build_result_rows(website.id, probe_result, datetime.now(timezone.utc))
+        await store_result_rows(db, rows)
         
     except Exception as e:
         logger.error(f"Error monitoring website {website.url}: {str(e)}")
-        db.rollback()
+        await db.rollback()
+        raise
+
+async def set_initial_check_status(website_ids: List[int], status: str) -> None:
+    """
+    Record the progress of the first check of newly added websites.
+    """
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(models.Website).where(models.Website.id.in_(website_ids)).values(initial_check_status=status)
+        )
+        await db.commit()
+
+async def monitor_website_group(website_ids: List[int]) -> None:
+    """
+    Probe the URL shared by a group of websites once and store the result for each.
+
+    Results go through the shared result sink when it is running, except
+    for websites still waiting for their first check: those are written
+    directly so that "done" means the results are stored.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(models.Website).where(
+                models.Website.id.in_(website_ids),
+                models.Website.is_active == True
+            )
+        )
+        websites = result.scalars().all()
+        # Release the connection while the probe is in flight
+        await db.commit()
+    if not websites:
+        return
+    
+    pending_ids = [website.id for website in websites if website.initial_check_status == "pending"]
+    if pending_ids:
+        await set_initial_check_status(pending_ids, "running")
+    
+    try:
+        probe_result = await probe_website(str(websites[0].url))
+        timestamp = datetime.now(timezone.utc)
+        rows = [
+            row for website in websites
+            for row in build_result_rows(website.id, probe_result, timestamp)
+        ]
+        
+        sink = get_result_sink()
+        if sink is not None and not pending_ids:
+            for model, row in rows:
+                await sink.put(model, row)
+        else:
+            async with AsyncSessionLocal() as db:
+                await store_result_rows(db, rows)
+    except (Exception, asyncio.CancelledError):
+        if pending_ids:
+            await set_initial_check_status(pending_ids, "failed")
         raise
+    
+    if pending_ids:
+        await set_initial_check_status(pending_ids, "done")
 
-async def monitor_all_websites(db: Session) -> None:
+async def monitor_all_websites(db: AsyncSession, concurrency: int = config.WORKER_CONCURRENCY) -> Dict[str, Any]:
     """
-    Monitor all active websites.
+    Monitor all active websites on a bounded worker pool.
+
+    Websites sharing a URL are probed once. Each check runs in its own
+    database session; the given session is only used to list the active
+    websites. Returns a summary of the run.
     """
-    websites = db.query(models.Website).filter(models.Website.is_active == True).all()
-    tasks = [monitor_website(db, website) for website in websites]
-    await asyncio.gather(*tasks)
\ No newline at end of file
+    result = await db.execute(
+        select(models.Website.id, models.Website.url).where(models.Website.is_active == True)
+    )
+    groups: Dict[str, List[int]] = {}
+    for row in result:
+        groups.setdefault(normalize_url(row.url), []).append(row.id)
+    
+    pool = CheckWorkerPool(monitor_website_group, concurrency=concurrency)
+    await pool.start()
+    try:
+        summary = await pool.run_all(groups.values())
+    finally:
+        await pool.stop()
+    
+    logger.info(
+        f"Monitored {summary['total']} targets in {summary['duration_seconds']:.1f}s: "
+        f"{summary['succeeded']} succeeded, {summary['failed']} failed, {summary['timed_out']} timed out"
+    )
+    return summary
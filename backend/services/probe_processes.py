@@ -0,0 +1,246 @@
+import asyncio
+import logging
+import multiprocessing
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+import models
+import config
+from database import Base, async_engine
+from services.http_client import start_http_client, close_http_client
+from services.result_sink import ResultSink, get_result_sink, start_result_sink, stop_result_sink
+from services.worker_pool import start_worker_pool, stop_worker_pool
+from services.scheduler import CheckScheduler
+from services.monitor_service import monitor_website_group
+from utils.urls import url_shard
+
+logger = logging.getLogger(__name__)
+
+RESULT_MODELS = {
+    model.__tablename__: model
+    for model in (models.MonitoringResult, models.SSLCheck, models.SecurityHeader)
+}
+
+class ForwardingSink(ResultSink):
+    """
+    Result sink of a probe process: batches rows and hands them to the
+    parent process instead of writing them.
+
+    Waits while the parent's queue is full, so a slow database slows the
+    probe processes down instead of piling up rows.
+    """
+
+    def __init__(self, results: multiprocessing.Queue):
+        super().__init__()
+        self._results = results
+
+    async def _write(self, batch: List[Tuple[Type[Base], Dict[str, Any]]]) -> None:
+        rows = [(model.__tablename__, row) for model, row in batch]
+        await asyncio.get_running_loop().run_in_executor(None, self._results.put, ("rows", rows))
+
+# Scheduler stats that differ between shards by taking the maximum instead of the sum
+MAX_STATS = {"current_lag_seconds", "last_lag_seconds", "max_lag_seconds"}
+
+def combine_scheduler_stats(shard_stats: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine the scheduler stats of several shards into one report."""
+    combined: Dict[str, Any] = {}
+    for stats in shard_stats:
+        for key, value in stats.items():
+            if key not in combined:
+                combined[key] = value
+            elif key in MAX_STATS:
+                combined[key] = max(combined[key], value)
+            else:
+                combined[key] += value
+    return combined
+
+async def _serve_shard(index: int, count: int, results, commands, stop) -> None:
+    loop = asyncio.get_running_loop()
+    await start_http_client()
+    await start_result_sink(ForwardingSink(results))
+    pool = await start_worker_pool(monitor_website_group)
+    scheduler = CheckScheduler(pool.run, shard=(index, count))
+    await scheduler.start()
+    logger.info(f"Probe process {index + 1}/{count} started")
+    last_report = None
+    try:
+        while not stop.is_set():
+            if last_report is None or loop.time() - last_report >= config.PROBE_STATS_INTERVAL:
+                try:
+                    # Best effort; a full queue means the parent is busy writing rows
+                    results.put_nowait(("stats", index, scheduler.stats()))
+                except queue.Full:
+                    pass
+                last_report = loop.time()
+            try:
+                website_id, url, interval, delay = await loop.run_in_executor(None, commands.get, True, 1.0)
+            except queue.Empty:
+                continue
+            scheduler.schedule(website_id, url, interval, delay=delay)
+    finally:
+        await scheduler.stop()
+        await stop_worker_pool()
+        # Flushes the remaining rows to the parent
+        await stop_result_sink()
+        await close_http_client()
+        await async_engine.dispose()
+
+def _run_probe_process(index: int, count: int, results, commands, stop) -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_serve_shard(index, count, results, commands, stop))
+
+class ProbeProcessPool:
+    """
+    Run scheduled checks in several processes, each with its own event
+    loop, HTTP client and scheduler for a shard of the monitored hosts.
+
+    Result rows come back over a bounded queue and are written by the
+    parent's result sink, so there is still a single writer. Websites
+    still waiting for their first check are written by the probe
+    process directly, as in monitor_website_group; the event relay
+    publishes those to stream subscribers.
+
+    Each process also reports its scheduler stats over the result queue.
+    A process that dies is logged and respawned; the new one loads its
+    shard's websites from the database when its scheduler starts.
+    """
+
+    def __init__(self, processes: int = config.PROBE_PROCESSES):
+        self._count = processes
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: List[multiprocessing.Process] = []
+        self._commands: List[multiprocessing.Queue] = []
+        self._results: Optional[multiprocessing.Queue] = None
+        self._stop = None
+        self._reader: Optional[asyncio.Task] = None
+        self._watchdog: Optional[asyncio.Task] = None
+        # One thread blocks on the result queue; keep it off the default executor
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="probe-results")
+        self._received_rows = 0
+        self._restarts = 0
+        self._shard_stats: Dict[int, Dict[str, Any]] = {}  # index -> latest scheduler stats
+
+    async def start(self) -> None:
+        """Spawn the probe processes and start collecting their results."""
+        if self._processes:
+            return
+        self._results = self._context.Queue(maxsize=config.PROBE_RESULT_QUEUE_SIZE)
+        self._stop = self._context.Event()
+        self._commands = [None] * self._count
+        self._processes = [None] * self._count
+        for index in range(self._count):
+            self._spawn(index)
+        self._reader = asyncio.create_task(self._read_results())
+        self._watchdog = asyncio.create_task(self._watch())
+
+    def _spawn(self, index: int) -> None:
+        # A fresh command queue; one a dead process was reading may be left locked
+        commands = self._context.Queue()
+        process = self._context.Process(
+            target=_run_probe_process,
+            args=(index, self._count, self._results, commands, self._stop),
+            name=f"probe-{index}",
+            daemon=True
+        )
+        process.start()
+        self._commands[index] = commands
+        self._processes[index] = process
+
+    async def _watch(self, interval: float = config.PROBE_WATCHDOG_INTERVAL) -> None:
+        while not self._stop.is_set():
+            await asyncio.sleep(interval)
+            for index, process in enumerate(self._processes):
+                if process.is_alive() or self._stop.is_set():
+                    continue
+                logger.error(f"Probe process {process.name} exited with code {process.exitcode}; restarting it")
+                self._shard_stats.pop(index, None)
+                self._restarts += 1
+                self._spawn(index)
+
+    async def _read_results(self) -> None:
+        loop = asyncio.get_running_loop()
+        sink = get_result_sink()
+        while True:
+            try:
+                message = await loop.run_in_executor(self._executor, self._results.get, True, 1.0)
+            except queue.Empty:
+                continue
+            if message is None:
+                return
+            if message[0] == "stats":
+                _, index, stats = message
+                self._shard_stats[index] = stats
+                continue
+            rows = message[1]
+            self._received_rows += len(rows)
+            for table_name, row in rows:
+                await sink.put(RESULT_MODELS[table_name], row)
+
+    def schedule(self, website_id: int, url: str, interval: int, delay: float = 0.0) -> None:
+        """Schedule a website in the process responsible for its host."""
+        if self._commands:
+            self._commands[url_shard(url, self._count)].put_nowait((website_id, url, interval, delay))
+
+    async def stop(self, timeout: float = config.CHECK_TIMEOUT) -> None:
+        """Stop the probe processes and write the results they still had."""
+        if not self._processes:
+            return
+        loop = asyncio.get_running_loop()
+        self._stop.set()
+        self._watchdog.cancel()
+        await asyncio.gather(self._watchdog, return_exceptions=True)
+        for process in self._processes:
+            await loop.run_in_executor(None, process.join, timeout)
+            if process.is_alive():
+                logger.warning(f"Probe process {process.name} did not stop in time; terminating it")
+                process.terminate()
+        # Every process has exited, so their rows are already in the queue ahead of this
+        await loop.run_in_executor(None, self._results.put, None)
+        await self._reader
+        self._processes = []
+        self._commands = []
+        self._executor.shutdown()
+
+    def stats(self) -> Dict[str, Any]:
+        """Report live and restarted processes and rows received from them."""
+        return {
+            "processes": self._count,
+            "alive_processes": sum(process.is_alive() for process in self._processes),
+            "restarts": self._restarts,
+            "received_rows": self._received_rows,
+        }
+
+    def scheduler_stats(self) -> Dict[str, Any]:
+        """Combine the latest scheduler stats reported by each process."""
+        return combine_scheduler_stats(self._shard_stats.values())
+
+_probe_processes: Optional[ProbeProcessPool] = None
+
+async def start_probe_processes() -> ProbeProcessPool:
+    """
+    Create and start the shared probe processes (called from the app lifespan).
+
+    Needs the result sink to be running.
+    """
+    global _probe_processes
+    if _probe_processes is None:
+        _probe_processes = ProbeProcessPool()
+        await _probe_processes.start()
+        logger.info(f"Started {config.PROBE_PROCESSES} probe processes")
+    return _probe_processes
+
+def get_probe_processes() -> Optional[ProbeProcessPool]:
+    """
+    Return the shared probe processes, or None when they are not running.
+    """
+    return _probe_processes
+
+async def stop_probe_processes() -> None:
+    """
+    Stop the shared probe processes.
+    """
+    global _probe_processes
+    if _probe_processes is not None:
+        await _probe_processes.stop()
+        logger.info("Stopped probe processes")
+    _probe_processes = None
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple, Type
+from sqlalchemy import insert
+import config
+from database import Base, AsyncSessionLocal
+from services.rollup_service import apply_results
+from services.event_broker import event_broker
+import models
+
+logger = logging.getLogger(__name__)
+
+# Queued by stop() so the writer flushes everything ahead of it and exits
+_STOP = object()
+
+class ResultSink:
+    """
+    Collect probe result rows in memory and write them with bulk inserts.
+
+    A batch is flushed once it reaches batch_size rows or has been open
+    for flush_interval seconds. The queue is bounded, so producers wait
+    in put() when the database falls behind.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = config.SINK_BATCH_SIZE,
+        flush_interval: float = config.SINK_FLUSH_INTERVAL,
+        max_pending: int = config.SINK_MAX_PENDING,
+        max_retries: int = config.SINK_MAX_RETRIES
+    ):
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_retries = max_retries
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+        self._totals = {"written_rows": 0, "dropped_rows": 0, "flushes": 0}
+
+    async def start(self) -> None:
+        """Start the background writer."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush every queued row and stop the writer."""
+        if self._task is not None:
+            await self._queue.put(_STOP)
+            await self._task
+            self._task = None
+
+    async def put(self, model: Type[Base], row: Dict[str, Any]) -> None:
+        """Queue a row for insertion, waiting while the queue is full."""
+        await self._queue.put((model, row))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = loop.time() + self._flush_interval
+            stopping = False
+            while len(batch) < self._batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, batch: List[Tuple[Type[Base], Dict[str, Any]]]) -> None:
+        for attempt in range(self._max_retries + 1):
+            try:
+                await self._write(batch)
+                self._totals["written_rows"] += len(batch)
+                self._totals["flushes"] += 1
+                return
+            except Exception as e:
+                logger.error(f"Error writing {len(batch)} result rows (attempt {attempt + 1}): {str(e)}")
+                if attempt < self._max_retries:
+                    await asyncio.sleep(2 ** attempt)
+        self._totals["dropped_rows"] += len(batch)
+
+    async def _write(self, batch: List[Tuple[Type[Base], Dict[str, Any]]]) -> None:
+        rows_by_model = defaultdict(list)
+        for model, row in batch:
+            rows_by_model[model].append(row)
+
+        async with AsyncSessionLocal() as db:
+            for model, rows in rows_by_model.items():
+                await db.execute(insert(model), rows)
+            await apply_results(db, rows_by_model.get(models.MonitoringResult, []))
+            await db.commit()
+        event_broker.publish_results(rows_by_model.get(models.MonitoringResult, []))
+
+    def stats(self) -> Dict[str, Any]:
+        """Report queued rows and cumulative write counts."""
+        return {"pending_rows": self._queue.qsize(), **self._totals}
+
+_sink: Optional[ResultSink] = None
+
+async def start_result_sink(sink: Optional[ResultSink] = None) -> ResultSink:
+    """
+    Create and start the shared result sink (called from the app lifespan).
+
+    A ResultSink subclass can be passed to handle rows differently.
+    """
+    global _sink
+    if _sink is None:
+        _sink = sink or ResultSink()
+        await _sink.start()
+        logger.info("Started result sink")
+    return _sink
+
+def get_result_sink() -> Optional[ResultSink]:
+    """
+    Return the shared result sink, or None when it is not running.
+    """
+    return _sink
+
+async def stop_result_sink() -> None:
+    """
+    Flush and stop the shared result sink.
+    """
+    global _sink
+    if _sink is not None:
+        await _sink.stop()
+        logger.info("Stopped result sink")
+    _sink = None
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from sqlalchemy import delete, select
+import models
+import config
+from database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+RAW_TABLES = [models.MonitoringResult, models.SSLCheck, models.SecurityHeader]
+
+# Rollup resolution -> days of history to keep
+ROLLUP_RETENTION_DAYS = {
+    "minute": config.RETENTION_MINUTE_ROLLUP_DAYS,
+    "hour": config.RETENTION_ROLLUP_DAYS,
+    "day": config.RETENTION_ROLLUP_DAYS,
+}
+
+async def delete_in_batches(table, where, batch_size: int = config.RETENTION_BATCH_SIZE) -> int:
+    """
+    Delete matching rows a batch at a time, each batch in its own transaction.
+    """
+    total = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            batch_ids = select(table.c.id).where(where).limit(batch_size).scalar_subquery()
+            result = await db.execute(delete(table).where(table.c.id.in_(batch_ids)))
+            await db.commit()
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            return total
+        # Let probes and API requests run between batches
+        await asyncio.sleep(0)
+
+async def enforce_retention() -> Dict[str, int]:
+    """
+    Remove raw results and rollups older than their retention period.
+
+    Expired rows are found through the timestamp and (resolution,
+    bucket_start) indexes and deleted in batches.
+    """
+    now = datetime.now(timezone.utc)
+    removed = {}
+
+    raw_cutoff = now - timedelta(days=config.RETENTION_RAW_DAYS)
+    for model in RAW_TABLES:
+        table = model.__table__
+        removed[table.name] = await delete_in_batches(table, table.c.timestamp < raw_cutoff)
+
+    rollups = models.MonitoringRollup.__table__
+    for resolution, days in ROLLUP_RETENTION_DAYS.items():
+        removed[f"{rollups.name}.{resolution}"] = await delete_in_batches(
+            rollups,
+            (rollups.c.resolution == resolution) & (rollups.c.bucket_start < now - timedelta(days=days))
+        )
+
+    return removed
+
+async def _run_retention(interval: float) -> None:
+    while True:
+        try:
+            removed = await enforce_retention()
+            logger.info(f"Retention removed {sum(removed.values())} rows: {removed}")
+        except Exception as e:
+            logger.error(f"Error enforcing retention: {str(e)}")
+        await asyncio.sleep(interval)
+
+_task: Optional[asyncio.Task] = None
+
+async def start_retention_job(interval: float = config.RETENTION_INTERVAL) -> None:
+    """
+    Start enforcing retention in the background (called from the app lifespan).
+    """
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(_run_retention(interval))
+        logger.info("Started retention job")
+
+async def stop_retention_job() -> None:
+    """
+    Stop the background retention job.
+    """
+    global _task
+    if _task is not None:
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+        logger.info("Stopped retention job")
+    _task = None
@@ -0,0 +1,158 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+import models
+
+RESOLUTIONS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+# Response times are counted in log-scale buckets so percentiles can be
+# merged incrementally; each bucket spans 10% of its lower bound
+HISTOGRAM_BASE = 1.1
+
+def bucket_start(timestamp: datetime, resolution: str) -> datetime:
+    """Truncate a timestamp to the start of its rollup bucket."""
+    if resolution == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    if resolution == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def histogram_bucket(response_time: float) -> int:
+    """Return the histogram bucket for a response time in seconds."""
+    milliseconds = response_time * 1000
+    if milliseconds <= 1:
+        return 0
+    return int(math.log(milliseconds, HISTOGRAM_BASE))
+
+def histogram_percentile(histogram: Dict[str, int], q: float) -> Optional[float]:
+    """Estimate the q-th percentile (0-100) in seconds from a histogram."""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    rank = q / 100 * total
+    seen = 0
+    for bucket in sorted(histogram, key=int):
+        seen += histogram[bucket]
+        if seen >= rank:
+            # Geometric midpoint of the bucket
+            return HISTOGRAM_BASE ** (int(bucket) + 0.5) / 1000
+    return None
+
+def _empty_delta() -> Dict[str, Any]:
+    return {
+        "count": 0,
+        "up_count": 0,
+        "response_count": 0,
+        "response_time_sum": 0.0,
+        "response_time_histogram": defaultdict(int),
+        "status_codes": defaultdict(int),
+    }
+
+async def apply_results(db: AsyncSession, rows: Iterable[Dict[str, Any]]) -> None:
+    """
+    Fold new MonitoringResult rows into the minute, hour and day rollups.
+
+    Runs in the caller's transaction so the rollups stay consistent with
+    the raw rows. Missing rollup rows are created first with an
+    insert-or-ignore, then the affected rows are locked and updated.
+    """
+    deltas: Dict[Tuple[int, str, datetime], Dict[str, Any]] = defaultdict(_empty_delta)
+    for row in rows:
+        for resolution in RESOLUTIONS:
+            delta = deltas[(row["website_id"], resolution, bucket_start(row["timestamp"], resolution))]
+            delta["count"] += 1
+            delta["up_count"] += 1 if row["is_up"] else 0
+            delta["status_codes"][str(row["status_code"])] += 1
+            # Failed requests have no meaningful response time
+            if row["status_code"]:
+                delta["response_count"] += 1
+                delta["response_time_sum"] += row["response_time"]
+                delta["response_time_histogram"][str(histogram_bucket(row["response_time"]))] += 1
+    if not deltas:
+        return
+
+    dialect = db.bind.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        await db.execute(
+            insert(models.MonitoringRollup).on_conflict_do_nothing(),
+            [
+                {
+                    "website_id": website_id,
+                    "resolution": resolution,
+                    "bucket_start": start,
+                    "count": 0,
+                    "up_count": 0,
+                    "response_count": 0,
+                    "response_time_sum": 0.0,
+                    "response_time_histogram": {},
+                    "status_codes": {},
+                }
+                for website_id, resolution, start in deltas
+            ]
+        )
+
+    result = await db.execute(
+        select(models.MonitoringRollup).where(
+            tuple_(
+                models.MonitoringRollup.website_id,
+                models.MonitoringRollup.resolution,
+                models.MonitoringRollup.bucket_start
+            ).in_(list(deltas))
+        ).with_for_update()
+    )
+    existing = {
+        (rollup.website_id, rollup.resolution, rollup.bucket_start.replace(tzinfo=None)): rollup
+        for rollup in result.scalars()
+    }
+
+    for (website_id, resolution, start), delta in deltas.items():
+        rollup = existing.get((website_id, resolution, start.replace(tzinfo=None)))
+        if rollup is None:
+            rollup = models.MonitoringRollup(
+                website_id=website_id,
+                resolution=resolution,
+                bucket_start=start,
+                count=0,
+                up_count=0,
+                response_count=0,
+                response_time_sum=0.0,
+                response_time_histogram={},
+                status_codes={},
+            )
+            db.add(rollup)
+        rollup.count += delta["count"]
+        rollup.up_count += delta["up_count"]
+        rollup.response_count += delta["response_count"]
+        rollup.response_time_sum += delta["response_time_sum"]
+        # JSON columns are only flushed when reassigned, so merge into new dicts
+        rollup.response_time_histogram = _merge_counts(rollup.response_time_histogram, delta["response_time_histogram"])
+        rollup.status_codes = _merge_counts(rollup.status_codes, delta["status_codes"])
+
+def _merge_counts(current: Optional[Dict[str, int]], delta: Dict[str, int]) -> Dict[str, int]:
+    merged = dict(current or {})
+    for key, count in delta.items():
+        merged[key] = merged.get(key, 0) + count
+    return merged
+
+def summarize_rollup(rollup: models.MonitoringRollup) -> Dict[str, Any]:
+    """Turn a rollup row into the statistics served by the API."""
+    histogram = rollup.response_time_histogram or {}
+    return {
+        "bucket_start": rollup.bucket_start,
+        "count": rollup.count,
+        "uptime_ratio": rollup.up_count / rollup.count if rollup.count else None,
+        "mean_response_time": rollup.response_time_sum / rollup.response_count if rollup.response_count else None,
+        "p50_response_time": histogram_percentile(histogram, 50),
+        "p95_response_time": histogram_percentile(histogram, 95),
+        "p99_response_time": histogram_percentile(histogram, 99),
+        "status_codes": rollup.status_codes or {},
+    }
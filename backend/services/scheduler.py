@@ -0,0 +1,307 @@
+import asyncio
+import heapq
+import logging
+import math
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import models
+import config
+from sqlalchemy import select
+from database import AsyncSessionLocal
+from utils.urls import normalize_url, url_shard
+
+logger = logging.getLogger(__name__)
+
+def clamp_interval(interval: Optional[float]) -> float:
+    """
+    Return a usable check interval in seconds.
+
+    Missing intervals fall back to the default and short or negative ones
+    are raised to MIN_MONITORING_INTERVAL, so a bad row can't make the
+    scheduler spin.
+    """
+    return max(interval or 300, config.MIN_MONITORING_INTERVAL, 1)
+
+def phase_offset(target: str, interval: float) -> float:
+    """
+    Return a target's fixed offset within its check interval, in seconds.
+
+    Derived from a hash of the target so websites with the same interval
+    are spread evenly instead of all falling due together, and websites
+    sharing a URL stay in step.
+    """
+    return zlib.crc32(target.encode()) / 2 ** 32 * interval
+
+def next_phase_slot(target: str, interval: float, after: float) -> float:
+    """Return the first of a target's check times (Unix seconds) strictly after `after`."""
+    interval = clamp_interval(interval)
+    offset = phase_offset(target, interval)
+    return offset + (math.floor((after - offset) / interval) + 1) * interval
+
+class CheckScheduler:
+    """
+    Run website checks as they fall due.
+
+    Websites are grouped into targets by normalized URL so that a URL
+    monitored by several websites is probed once. Each target has one
+    item in a min-heap ordered by its next due time. When it is popped,
+    every subscribed website whose own check falls due within half of the
+    target's shortest interval receives the result; the others keep their
+    own cadence. Changed or removed targets are handled lazily: heap items
+    carry a generation number and stale ones are skipped when popped.
+
+    Checks run in fixed slots given by next_phase_slot(). A website added
+    with schedule() is checked after its delay and then joins its slots.
+
+    With a shard of (index, count), only URLs whose host is assigned to
+    that shard by url_shard() are scheduled, so several schedulers can
+    split the load.
+    """
+
+    def __init__(
+        self,
+        run_check: Callable[[List[int]], Awaitable[Any]],
+        sync_interval: float = config.SCHEDULER_SYNC_INTERVAL,
+        shard: Optional[Tuple[int, int]] = None
+    ):
+        self._run_check = run_check
+        self._sync_interval = sync_interval
+        self._shard = shard
+        self._heap: List[Tuple[float, str, int]] = []  # (due, target, generation)
+        self._targets: Dict[str, Dict[str, Any]] = {}  # target -> websites, generation, due
+        self._websites: Dict[int, Dict[str, Any]] = {}  # website_id -> target, interval, due, checked
+        self._generation = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._checks: Dict[str, asyncio.Task] = {}  # target -> running check
+        self._last_sync = 0.0
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+        self._dispatched = 0
+        self._skipped = 0
+
+    def _now(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    def _next_slot(self, target: str, interval: float, after: float) -> float:
+        """Return the next phase slot of a target after a loop time, as a loop time."""
+        clock_offset = time.time() - self._now()
+        return next_phase_slot(target, interval, after + clock_offset) - clock_offset
+
+    def schedule(self, website_id: int, url: str, interval: int, delay: float = 0.0) -> None:
+        """Add a website, or update its URL or interval if it is already scheduled."""
+        target = normalize_url(url)
+        interval = clamp_interval(interval)
+        entry = self._websites.get(website_id)
+        if entry is not None and entry["target"] == target and entry["interval"] == interval:
+            return
+        due = self._now() + delay
+        checked = False
+        if entry is not None:
+            if entry["target"] == target:
+                # An interval change should not trigger an immediate extra check
+                due = min(entry["due"], self._now() + interval)
+                checked = entry["checked"]
+            self.unschedule(website_id)
+        self._websites[website_id] = {"target": target, "interval": interval, "due": due, "checked": checked}
+        self._targets.setdefault(target, {"websites": set(), "generation": 0, "due": None})["websites"].add(website_id)
+        self._reschedule(target)
+
+    def unschedule(self, website_id: int) -> None:
+        """Stop checking a website."""
+        entry = self._websites.pop(website_id, None)
+        if entry is None:
+            return
+        target = self._targets[entry["target"]]
+        target["websites"].discard(website_id)
+        if target["websites"]:
+            self._reschedule(entry["target"])
+        else:
+            del self._targets[entry["target"]]
+
+    def _reschedule(self, target: str) -> None:
+        """Queue a target at the earliest due time of its websites."""
+        entry = self._targets[target]
+        due = min(self._websites[website_id]["due"] for website_id in entry["websites"])
+        if entry["due"] == due:
+            return
+        self._generation += 1
+        entry["generation"] = self._generation
+        entry["due"] = due
+        heapq.heappush(self._heap, (due, target, self._generation))
+        self._wakeup.set()
+
+    def sync(self, websites: List[Tuple[int, str, int]]) -> None:
+        """Reconcile scheduled entries with (website_id, url, interval) of active websites."""
+        active = {
+            website_id: (url, interval) for website_id, url, interval in websites
+            if self._shard is None or url_shard(url, self._shard[1]) == self._shard[0]
+        }
+        for website_id in list(self._websites):
+            if website_id not in active:
+                self.unschedule(website_id)
+        now = self._now()
+        for website_id, (url, interval) in active.items():
+            # Websites seen for the first time start in their phase slot
+            delay = 0.0
+            if website_id not in self._websites:
+                delay = self._next_slot(normalize_url(url), interval, now) - now
+            self.schedule(website_id, url, interval, delay=delay)
+
+    async def _load_active_websites(self) -> List[Tuple[int, str, int]]:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(models.Website.id, models.Website.url, models.Website.monitoring_interval).where(
+                    models.Website.is_active == True
+                )
+            )
+            return [(row.id, row.url, row.monitoring_interval or 300) for row in result]
+
+    async def _sync_from_db(self) -> None:
+        try:
+            self.sync(await self._load_active_websites())
+        except Exception as e:
+            logger.error(f"Error syncing scheduled websites: {str(e)}")
+        self._last_sync = self._now()
+
+    def _dispatch(self, target: str, website_ids: List[int]) -> bool:
+        if target in self._checks:
+            # The previous check is still running; don't pile up another one
+            self._skipped += 1
+            return False
+        task = asyncio.create_task(self._run_check(website_ids))
+        self._checks[target] = task
+        task.add_done_callback(lambda t: self._check_done(target, t))
+        return True
+
+    def _check_done(self, target: str, task: asyncio.Task) -> None:
+        self._checks.pop(target, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Scheduled check for {target} failed: {task.exception()}")
+        entry = self._targets.get(target)
+        if entry is not None and entry["due"] is None:
+            # Websites whose first check was skipped are still due; run them now
+            self._reschedule(target)
+
+    def _dispatch_due(self, target: str, entry: Dict[str, Any], due: float, now: float) -> None:
+        # Share the probe with websites that would otherwise be due before the next one
+        window = now + min(self._websites[website_id]["interval"] for website_id in entry["websites"]) / 2
+        website_ids = sorted(
+            website_id for website_id in entry["websites"]
+            if self._websites[website_id]["due"] <= window
+        )
+
+        self._last_lag = now - due
+        self._max_lag = max(self._max_lag, self._last_lag)
+        self._dispatched += 1
+        dispatched = self._dispatch(target, website_ids)
+
+        waiting = False
+        for website_id in website_ids:
+            website = self._websites[website_id]
+            if dispatched:
+                website["checked"] = True
+            elif not website["checked"]:
+                # A first check must not wait a whole interval; retry when the running check ends
+                waiting = True
+                continue
+            # Move to the next phase slot, skipping slots we fell behind on
+            website["due"] = self._next_slot(target, website["interval"], max(website["due"], now))
+        entry["due"] = None
+        if not waiting:
+            self._reschedule(target)
+
+    async def _run(self) -> None:
+        while True:
+            now = self._now()
+            if now - self._last_sync >= self._sync_interval:
+                await self._sync_from_db()
+                now = self._now()
+
+            while self._heap and self._heap[0][0] <= now:
+                due, target, generation = heapq.heappop(self._heap)
+                entry = self._targets.get(target)
+                if entry is None or entry["generation"] != generation:
+                    continue
+                try:
+                    self._dispatch_due(target, entry, due, now)
+                except Exception as e:
+                    # Drop the target rather than the loop; the next sync schedules it afresh
+                    logger.error(f"Error dispatching scheduled check for {target}: {str(e)}")
+                    for website_id in list(entry["websites"]):
+                        self.unschedule(website_id)
+
+            timeout = self._last_sync + self._sync_interval - now
+            if self._heap:
+                timeout = min(timeout, self._heap[0][0] - now)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self) -> None:
+        """Load active websites and start dispatching checks."""
+        if self._task is None:
+            await self._sync_from_db()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop dispatching and cancel checks that are still running."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        tasks = list(self._checks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Report queue size and how far behind schedule checks are running."""
+        now = self._now()
+        overdue = [
+            now - due for due, target, generation in self._heap
+            if due <= now and self._targets.get(target, {}).get("generation") == generation
+        ]
+        return {
+            "scheduled_websites": len(self._websites),
+            "scheduled_targets": len(self._targets),
+            "running_checks": len(self._checks),
+            "dispatched_checks": self._dispatched,
+            "skipped_checks": self._skipped,
+            "overdue_checks": len(overdue),
+            "current_lag_seconds": max(overdue, default=0.0),
+            "last_lag_seconds": self._last_lag,
+            "max_lag_seconds": self._max_lag,
+        }
+
+_scheduler: Optional[CheckScheduler] = None
+
+async def start_scheduler(run_check: Callable[[List[int]], Awaitable[Any]]) -> CheckScheduler:
+    """
+    Create and start the shared scheduler (called from the app lifespan).
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = CheckScheduler(run_check)
+        await _scheduler.start()
+        logger.info("Started check scheduler")
+    return _scheduler
+
+def get_scheduler() -> Optional[CheckScheduler]:
+    """
+    Return the shared scheduler, or None when it is not running.
+    """
+    return _scheduler
+
+async def stop_scheduler() -> None:
+    """
+    Stop the shared scheduler.
+    """
+    global _scheduler
+    if _scheduler is not None:
+        await _scheduler.stop()
+        logger.info("Stopped check scheduler")
+    _scheduler = None
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import config
+
+logger = logging.getLogger(__name__)
+
+class CheckWorkerPool:
+    """
+    Run website checks on a fixed number of worker tasks fed from a queue.
+
+    A check is whatever run_check accepts (a website id, or a group of ids
+    sharing a URL). Each one is bounded by a timeout and its outcome is
+    counted as succeeded, failed or timed_out.
+    """
+
+    def __init__(
+        self,
+        run_check: Callable[[Any], Awaitable[Any]],
+        concurrency: int = config.WORKER_CONCURRENCY,
+        check_timeout: float = config.CHECK_TIMEOUT
+    ):
+        self._run_check = run_check
+        self._concurrency = concurrency
+        self._check_timeout = check_timeout
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._totals = {"succeeded": 0, "failed": 0, "timed_out": 0, "check_seconds": 0.0}
+
+    async def start(self) -> None:
+        """Start the worker tasks."""
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self._concurrency)]
+
+    async def stop(self) -> None:
+        """Cancel the workers and any checks still waiting in the queue."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+
+    def submit(self, job: Any) -> asyncio.Future:
+        """Queue a check without waiting; the future resolves to its outcome and duration."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((job, future))
+        return future
+
+    async def run(self, job: Any) -> Tuple[str, float]:
+        """Queue a check and wait for its outcome and duration in seconds."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((job, future))
+        return await future
+
+    async def run_all(self, jobs: Iterable[Any]) -> Dict[str, Any]:
+        """Run several checks and summarize the run."""
+        start_time = time.perf_counter()
+        results = await asyncio.gather(*(self.run(job) for job in jobs))
+        summary = {
+            "total": len(results),
+            "succeeded": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "check_seconds": sum(elapsed for _, elapsed in results),
+            "duration_seconds": time.perf_counter() - start_time,
+        }
+        for outcome, _ in results:
+            summary[outcome] += 1
+        return summary
+
+    async def _worker(self) -> None:
+        while True:
+            job, future = await self._queue.get()
+            try:
+                if future.cancelled():
+                    continue
+                result = await self._execute(job)
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, job: Any) -> Tuple[str, float]:
+        start_time = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._run_check(job), timeout=self._check_timeout)
+            outcome = "succeeded"
+        except asyncio.TimeoutError:
+            logger.warning(f"Check {job} timed out after {self._check_timeout}s")
+            outcome = "timed_out"
+        except Exception as e:
+            logger.error(f"Check {job} failed: {str(e)}")
+            outcome = "failed"
+        elapsed = time.perf_counter() - start_time
+        self._totals[outcome] += 1
+        self._totals["check_seconds"] += elapsed
+        return outcome, elapsed
+
+    def stats(self) -> Dict[str, Any]:
+        """Report queue depth and cumulative outcomes."""
+        return {
+            "concurrency": self._concurrency,
+            "queued_checks": self._queue.qsize(),
+            **self._totals,
+        }
+
+_pool: Optional[CheckWorkerPool] = None
+
+async def start_worker_pool(run_check: Callable[[Any], Awaitable[Any]]) -> CheckWorkerPool:
+    """
+    Create and start the shared worker pool (called from the app lifespan).
+    """
+    global _pool
+    if _pool is None:
+        _pool = CheckWorkerPool(run_check)
+        await _pool.start()
+        logger.info(f"Started worker pool with {config.WORKER_CONCURRENCY} workers")
+    return _pool
+
+def get_worker_pool() -> Optional[CheckWorkerPool]:
+    """
+    Return the shared worker pool, or None when it is not running.
+    """
+    return _pool
+
+async def stop_worker_pool() -> None:
+    """
+    Stop the shared worker pool.
+    """
+    global _pool
+    if _pool is not None:
+        await _pool.stop()
+        logger.info("Stopped worker pool")
+    _pool = None
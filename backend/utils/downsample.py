@@ -0,0 +1,62 @@
+from typing import List, Sequence
+
+def lttb(x: Sequence[float], y: Sequence[float], threshold: int) -> List[int]:
+    """
+    Pick the indices of at most `threshold` points that preserve the shape
+    of a series (Largest-Triangle-Three-Buckets).
+
+    The first and last points are always kept; from every bucket in
+    between the point forming the largest triangle with its neighbours is
+    chosen, so spikes survive.
+    """
+    n = len(x)
+    if threshold >= n:
+        return list(range(n))
+    if threshold < 3:
+        return [0, n - 1][:threshold]
+
+    selected = [0]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+
+        # Average of the next bucket is the third vertex
+        next_start = end
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        count = next_end - next_start
+        avg_x = sum(x[next_start:next_end]) / count
+        avg_y = sum(y[next_start:next_end]) / count
+
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+
+    selected.append(n - 1)
+    return selected
+
+def min_max_buckets(y: Sequence[float], threshold: int) -> List[int]:
+    """
+    Pick the indices of the minimum and maximum of each of threshold/2
+    equal buckets, in order, so extremes are never dropped.
+    """
+    n = len(y)
+    if threshold >= n:
+        return list(range(n))
+    buckets = max(threshold // 2, 1)
+    selected = []
+    for i in range(buckets):
+        start = i * n // buckets
+        end = (i + 1) * n // buckets
+        if start >= end:
+            continue
+        indices = range(start, end)
+        low = min(indices, key=lambda j: y[j])
+        high = max(indices, key=lambda j: y[j])
+        selected.extend(sorted({low, high}))
+    return selected
@@ -1,13 +1,19 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from database import get_db
+from utils.ttl_cache import TTLCache
 import models
 import schemas
+import config
 import os
 from dotenv import load_dotenv
 
@@ -18,9 +24,19 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes with a different cost are flagged by verify_and_update and rehashed on login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=config.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=config.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=config.BCRYPT_ROUNDS
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Token subject (email) -> detached User, so authenticated requests skip the users query
+_user_cache = TTLCache(config.USER_CACHE_SIZE, config.USER_CACHE_TTL)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
     return pwd_context.verify(plain_password, hashed_password)
@@ -29,11 +45,68 @@ def get_password_hash(password: str) -> str:
     """Generate password hash."""
     return pwd_context.hash(password)
 
-def authenticate_user(db: Session, email: str, password: str):
+# bcrypt releases the GIL, so a few threads keep hashing off the event loop;
+# the bound stops a burst of logins from starving everything else of CPU
+_password_executor = ThreadPoolExecutor(max_workers=config.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+async def hash_password(password: str) -> str:
+    """Generate a password hash without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password without blocking the event loop.
+
+    Also returns a new hash when the stored one uses an outdated cost.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _password_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.User]:
+    """Load a user by email."""
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    return result.scalars().first()
+
+def invalidate_cached_user(email: str) -> None:
+    """Drop a user from the authentication cache, e.g. after deactivating them."""
+    _user_cache.invalidate(email)
+
+def user_cache_stats() -> dict:
+    """Report the authentication cache's size and hit rate."""
+    return _user_cache.stats()
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    # Remember users changed in this transaction, including their previous emails
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models.User):
+            emails = session.info.setdefault("changed_user_emails", set())
+            emails.add(obj.email)
+            emails.update(inspect(obj).attrs.email.history.deleted or ())
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for email in session.info.pop("changed_user_emails", ()):
+        invalidate_cached_user(email)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    session.info.pop("changed_user_emails", None)
+
+async def authenticate_user(db: AsyncSession, email: str, password: str):
     """Authenticate a user."""
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if not user or not verify_password(password, user.hashed_password):
+    user = await get_user_by_email(db, email)
+    if not user:
         return False
+    verified, new_hash = await verify_and_update_password(password, user.hashed_password)
+    if not verified:
+        return False
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
     return user
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -49,7 +122,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> models.User:
     """Get current authenticated user."""
     credentials_exception = HTTPException(
@@ -66,9 +139,14 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
         
-    user = db.query(models.User).filter(models.User.email == token_data.email).first()
+    user = _user_cache.get(token_data.email)
     if user is None:
-        raise credentials_exception
+        user = await get_user_by_email(db, token_data.email)
+        if user is None:
+            raise credentials_exception
+        # Detach it so the cached copy outlives this request's session
+        db.expunge(user)
+        _user_cache.set(token_data.email, user)
     return user
 
 async def get_current_active_user(
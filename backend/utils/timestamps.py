@@ -0,0 +1,12 @@
+from datetime import datetime, timezone
+from typing import Any
+
+def as_utc(value: Any) -> Any:
+    """
+    Mark a naive datetime as UTC; other values are returned unchanged.
+
+    SQLite returns the stored UTC timestamps without a timezone.
+    """
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
@@ -0,0 +1,35 @@
+import zlib
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL so that equivalent spellings compare equal.
+
+    Lowercases scheme and host, drops default ports, fragments and the
+    trailing dot of fully qualified hosts, and uses "/" for an empty path.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    if ":" in host:
+        host = f"[{host}]"  # IPv6 literal
+    netloc = host
+    if parts.port is not None and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parts.port}"
+    if parts.username:
+        credentials = parts.username + (f":{parts.password}" if parts.password else "")
+        netloc = f"{credentials}@{netloc}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+def url_shard(url: str, shards: int) -> int:
+    """
+    Assign a URL to one of several shards by its host.
+
+    Stable across processes and restarts (unlike hash()). All URLs on a
+    host land in the same shard, so per-host limits kept by each shard
+    hold across shards.
+    """
+    host = urlsplit(normalize_url(url)).hostname or ""
+    return zlib.crc32(host.encode()) % shards
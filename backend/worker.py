@@ -0,0 +1,153 @@
+"""
+Standalone probe worker for SCHEDULER_MODE=queue.
+
+Claims due checks from the check_queue table, runs them and writes the
+results. Any number of workers, on one machine or several, can share a
+database:
+
+    python worker.py --concurrency 50
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set
+import config
+from database import async_engine
+from services.http_client import start_http_client, close_http_client
+from services.result_sink import start_result_sink, stop_result_sink
+from services.worker_pool import CheckWorkerPool
+from services.monitor_service import monitor_website_group
+from services.check_queue import claim_checks, release_checks, renew_leases, sync_queue
+from utils.urls import normalize_url
+
+logger = logging.getLogger(__name__)
+
+class QueueWorker:
+    """
+    Run checks leased from the shared queue on a local worker pool.
+
+    Claimed websites sharing a URL are probed once. Leases are renewed
+    while their checks run and released with the next due time when they
+    finish; if the worker dies, its leases expire and other workers pick
+    the checks up.
+    """
+
+    def __init__(
+        self,
+        worker_id: str,
+        concurrency: int = config.WORKER_CONCURRENCY,
+        poll_interval: float = config.QUEUE_POLL_INTERVAL,
+        lease_seconds: float = config.QUEUE_LEASE_SECONDS,
+        sync_interval: float = config.QUEUE_SYNC_INTERVAL
+    ):
+        self._worker_id = worker_id
+        self._concurrency = concurrency
+        self._poll_interval = poll_interval
+        self._lease_seconds = lease_seconds
+        self._sync_interval = sync_interval
+        self._pool = CheckWorkerPool(monitor_website_group, concurrency)
+        self._running: Set[int] = set()  # website ids with a check in flight
+        self._tasks: Set[asyncio.Task] = set()
+        self._stopping: Optional[asyncio.Event] = None
+
+    async def _run_group(self, checks: List[Dict[str, Any]]) -> None:
+        try:
+            await self._pool.run([check["website_id"] for check in checks])
+            await release_checks(self._worker_id, checks)
+        except Exception as e:
+            # The leases expire and the checks are claimed again
+            logger.error(f"Error releasing checks {[check['website_id'] for check in checks]}: {str(e)}")
+        finally:
+            self._running.difference_update(check["website_id"] for check in checks)
+
+    async def _renew(self) -> None:
+        while True:
+            await asyncio.sleep(self._lease_seconds / 3)
+            try:
+                await renew_leases(self._worker_id, list(self._running), self._lease_seconds)
+            except Exception as e:
+                logger.error(f"Error renewing leases: {str(e)}")
+
+    async def _claim(self) -> int:
+        free = self._concurrency - len(self._tasks)
+        if free <= 0:
+            return 0
+        checks = await claim_checks(self._worker_id, min(free, config.QUEUE_CLAIM_BATCH_SIZE), self._lease_seconds)
+        groups = defaultdict(list)
+        for check in checks:
+            groups[normalize_url(str(check["url"]))].append(check)
+            self._running.add(check["website_id"])
+        for group in groups.values():
+            task = asyncio.create_task(self._run_group(group))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return len(checks)
+
+    async def run(self) -> None:
+        """Claim and run checks until stop() is called."""
+        self._stopping = asyncio.Event()
+        await self._pool.start()
+        renew_task = asyncio.create_task(self._renew())
+        loop = asyncio.get_running_loop()
+        last_sync = None
+        try:
+            while not self._stopping.is_set():
+                if last_sync is None or loop.time() - last_sync >= self._sync_interval:
+                    try:
+                        await sync_queue()
+                    except Exception as e:
+                        logger.error(f"Error syncing check queue: {str(e)}")
+                    last_sync = loop.time()
+
+                try:
+                    claimed = await self._claim()
+                except Exception as e:
+                    logger.error(f"Error claiming checks: {str(e)}")
+                    claimed = 0
+                if claimed:
+                    continue
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self._poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            # Let running checks finish so their leases are released
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            renew_task.cancel()
+            await asyncio.gather(renew_task, return_exceptions=True)
+            await self._pool.stop()
+
+    def stop(self) -> None:
+        """Stop claiming checks; run() returns once running checks finish."""
+        if self._stopping is not None:
+            self._stopping.set()
+
+async def main(concurrency: int) -> None:
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    worker = QueueWorker(worker_id, concurrency)
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, worker.stop)
+
+    await start_http_client()
+    await start_result_sink()
+    logger.info(f"Worker {worker_id} started with concurrency {concurrency}")
+    try:
+        await worker.run()
+    finally:
+        await stop_result_sink()
+        await close_http_client()
+        await async_engine.dispose()
+        logger.info(f"Worker {worker_id} stopped")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run checks from the shared check queue.")
+    parser.add_argument("--concurrency", type=int, default=config.WORKER_CONCURRENCY, help="checks run at once")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.concurrency))
@@ -2,7 +2,9 @@ import streamlit as st
 import requests
 import pandas as pd
 import plotly.express as px
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
 
 # Configure Streamlit page
 st.set_page_config(
@@ -82,11 +84,65 @@ def main():
 
 # Constants
 API_URL = "http://localhost:8000"
+CACHE_TTL_SECONDS = 30  # how long fetched API data is reused across reruns
+CHART_POINTS = 500  # points per chart after server-side downsampling
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """Pooled HTTP session shared by every API call."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def fetch_json(endpoint: str, token: str):
+    """GET an API endpoint and return its JSON body; raises on errors."""
+    response = get_http_session().get(
+        f"{API_URL}{endpoint}",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    response.raise_for_status()
+    return response.json()
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def fetch_websites(token: str):
+    """Fetch the user's websites (cached per token)."""
+    return fetch_json("/monitor/websites/", token)
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def fetch_website_data(website_id: int, token: str):
+    """Fetch results, chart, SSL and security data of a website concurrently (cached per token)."""
+    endpoints = {
+        "results": f"/monitor/websites/{website_id}/results?limit=1",
+        "chart": f"/monitor/websites/{website_id}/chart?points={CHART_POINTS}",
+        "ssl": f"/monitor/websites/{website_id}/ssl",
+        "security": f"/monitor/websites/{website_id}/security",
+    }
+    with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+        futures = {key: executor.submit(fetch_json, endpoint, token) for key, endpoint in endpoints.items()}
+        return {key: future.result() for key, future in futures.items()}
+
+def invalidate_cache():
+    """Drop cached API data so the next render refetches it."""
+    fetch_websites.clear()
+    fetch_website_data.clear()
+
+def cached_request(fetch, *args):
+    """Call a cached fetch function, showing errors like api_request does."""
+    try:
+        return fetch(*args)
+    except requests.exceptions.HTTPError as http_err:
+        st.error(f"HTTP Error: {http_err.response.status_code} - {http_err.response.reason}")
+        return None
+    except Exception as e:
+        st.error("An unexpected error occurred. Please try again later.")
+        return None
 
 def get_token(email: str, password: str) -> str:
     """Get authentication token from API."""
     try:
-        response = requests.post(
+        response = get_http_session().post(
             f"{API_URL}/token",
             params={"email": email, "password": password}
         )
@@ -103,7 +159,7 @@ def api_request(endpoint: str, method="get", token=None, **kwargs):
     """Make authenticated API request."""
     headers = {"Authorization": f"Bearer {token}"} if token else {}
     try:
-        response = requests.request(method, f"{API_URL}{endpoint}", headers=headers, **kwargs)
+        response = get_http_session().request(method, f"{API_URL}{endpoint}", headers=headers, **kwargs)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.HTTPError as http_err:
@@ -148,6 +204,7 @@ def add_website_form(token):
                     json={"url": url, "name": name, "monitoring_interval": monitoring_interval}
                 )
                 if response:
+                    invalidate_cache()
                     st.success("Website added successfully!")
                     st.rerun()
 
@@ -156,9 +213,11 @@ def display_website_metrics(website, token):
     col1, col2, col3 = st.columns(3)
     
     # Fetch monitoring results, SSL checks, and security headers
-    results = api_request(f"/monitor/websites/{website['id']}/results", token=token)
-    ssl_checks = api_request(f"/monitor/websites/{website['id']}/ssl", token=token)
-    security_headers = api_request(f"/monitor/websites/{website['id']}/security", token=token)
+    data = cached_request(fetch_website_data, website['id'], token) or {}
+    results = data.get("results")
+    chart = data.get("chart")
+    ssl_checks = data.get("ssl")
+    security_headers = data.get("security")
     
     # Display website status
     if results:
@@ -193,10 +252,12 @@ def display_website_metrics(website, token):
     else:
         st.warning("Security score unavailable.")
 
-    # Graphs for response time
-    if results:
-        df = pd.DataFrame(results)
+    # Graphs for response time (series are downsampled by the API)
+    if chart and chart.get("response_time"):
+        df = pd.DataFrame(chart["response_time"])
         df['timestamp'] = pd.to_datetime(df['timestamp'])
+        uptime_df = pd.DataFrame(chart["uptime"])
+        uptime_df['timestamp'] = pd.to_datetime(uptime_df['timestamp'])
 
         # Response Time Graph
         fig_response = px.line(
@@ -210,7 +271,7 @@ def display_website_metrics(website, token):
 
         # Uptime History Graph
         fig_uptime = px.scatter(
-            df,
+            uptime_df,
             x='timestamp',
             y='status_code',
             color='is_up',
@@ -243,6 +304,7 @@ def main():
         # Sidebar
         st.sidebar.title("Navigation")
         if st.sidebar.button("Logout"):
+            invalidate_cache()
             st.session_state.logged_in = False
             st.session_state.token = None
             st.rerun()
@@ -254,7 +316,7 @@ def main():
         future_features()
 
         # Get user's websites
-        websites = api_request("/monitor/websites/", token=st.session_state.token)
+        websites = cached_request(fetch_websites, st.session_state.token)
         
         if websites:
             # Website selector
@@ -275,6 +337,7 @@ def main():
                         method="post",
                         token=st.session_state.token
                     )
+                    invalidate_cache()
                     st.success("Website check triggered!")
                     st.rerun()
                 
@@ -1 +1,46 @@
- 
+import os
+import sys
+import tempfile
+import pytest
+import pytest_asyncio
+
+# The backend is run from its own directory and uses flat imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+# Must be set before database.py and utils/security.py are first imported
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+@pytest.fixture
+def tables():
+    from database import Base, engine
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def user(tables):
+    import models
+    from database import SessionLocal
+    with SessionLocal() as db:
+        db_user = models.User(email="owner@example.com", hashed_password="x", is_active=True)
+        db.add(db_user)
+        db.commit()
+        db.refresh(db_user)
+        db.expunge(db_user)
+    yield db_user
+    # The tables are recreated for every test, so don't keep the user cached
+    from utils.security import invalidate_cached_user
+    invalidate_cached_user(db_user.email)
+
+@pytest_asyncio.fixture
+async def api(user):
+    """HTTP client for the app, authenticated as user; the lifespan is not run."""
+    import httpx
+    from main import app
+    from utils.security import get_current_active_user
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import select
+import models
+from database import AsyncSessionLocal
+from services.check_queue import claim_checks, queue_stats, release_checks, renew_leases
+from utils.timestamps import as_utc
+
+@pytest.mark.asyncio
+async def test_queue_stats_reports_lag_of_oldest_unleased_due_check(tables):
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        db.add_all([
+            # Due for a while, waiting for a worker
+            models.CheckQueueEntry(website_id=1, due_at=now - timedelta(seconds=90)),
+            models.CheckQueueEntry(website_id=2, due_at=now - timedelta(seconds=30)),
+            # Leased by a worker; not lag
+            models.CheckQueueEntry(
+                website_id=3, due_at=now - timedelta(seconds=600),
+                leased_by="worker", lease_expires_at=now + timedelta(seconds=60)
+            ),
+            # Not due yet
+            models.CheckQueueEntry(website_id=4, due_at=now + timedelta(seconds=60)),
+        ])
+        await db.commit()
+
+    stats = await queue_stats()
+
+    assert stats["due_checks"] == 2
+    assert stats["leased_checks"] == 1
+    assert 90 <= stats["lag_seconds"] < 100
+
+@pytest.mark.asyncio
+async def test_queue_stats_without_due_checks(tables):
+    assert await queue_stats() == {"due_checks": 0, "leased_checks": 0, "lag_seconds": 0.0}
+
+async def add_due_checks(count, due_at=None):
+    due_at = due_at or datetime.now(timezone.utc) - timedelta(seconds=5)
+    async with AsyncSessionLocal() as db:
+        for website_id in range(1, count + 1):
+            db.add(models.Website(
+                id=website_id, url=f"https://site{website_id}.example.com/", name=f"Site {website_id}",
+                owner_id=1, monitoring_interval=300
+            ))
+            db.add(models.CheckQueueEntry(website_id=website_id, due_at=due_at))
+        await db.commit()
+
+async def queue_entries():
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(models.CheckQueueEntry).order_by(models.CheckQueueEntry.website_id))
+        return result.scalars().all()
+
+@pytest.mark.asyncio
+async def test_concurrent_claims_do_not_overlap(tables):
+    await add_due_checks(20)
+
+    # On SQLite racing claims may pick the same candidates and all but one
+    # come back empty-handed; keep claiming until every check is leased
+    owners = {}
+    for _ in range(10):
+        claims = await asyncio.gather(*(claim_checks(f"worker-{i}", limit=8) for i in range(4)))
+        for i, checks in enumerate(claims):
+            for check in checks:
+                assert check["website_id"] not in owners
+                owners[check["website_id"]] = f"worker-{i}"
+        if len(owners) == 20:
+            break
+
+    assert sorted(owners) == list(range(1, 21))
+    assert {entry.website_id: entry.leased_by for entry in await queue_entries()} == owners
+
+@pytest.mark.asyncio
+async def test_leased_checks_are_not_claimed_again_until_the_lease_expires(tables):
+    await add_due_checks(3)
+
+    first = await claim_checks("worker-a", limit=10, lease_seconds=0.2)
+    assert len(first) == 3
+    assert await claim_checks("worker-b", limit=10) == []
+
+    # worker-a died without releasing; its leases run out
+    await asyncio.sleep(0.3)
+    second = await claim_checks("worker-b", limit=10)
+    assert sorted(check["website_id"] for check in second) == [1, 2, 3]
+
+    # The stale worker's release does not touch checks now leased by another worker
+    await release_checks("worker-a", first)
+    assert all(entry.leased_by == "worker-b" for entry in await queue_entries())
+
+@pytest.mark.asyncio
+async def test_renewed_leases_outlive_their_original_expiry(tables):
+    await add_due_checks(1)
+    await claim_checks("worker-a", limit=10, lease_seconds=0.2)
+    await renew_leases("worker-a", [1], lease_seconds=60)
+    await asyncio.sleep(0.3)
+    assert await claim_checks("worker-b", limit=10) == []
+
+@pytest.mark.asyncio
+async def test_release_moves_checks_to_their_next_slot(tables):
+    await add_due_checks(2)
+    checks = await claim_checks("worker-a", limit=10)
+
+    before = datetime.now(timezone.utc)
+    await release_checks("worker-a", checks)
+
+    for entry in await queue_entries():
+        assert entry.leased_by is None and entry.lease_expires_at is None
+        assert as_utc(entry.last_run_at) >= before
+        assert before < as_utc(entry.due_at) <= before + timedelta(seconds=300)
+    assert await claim_checks("worker-b", limit=10) == []
@@ -0,0 +1,51 @@
+import math
+import pytest
+from utils.downsample import lttb, min_max_buckets
+
+def series(n):
+    x = [float(i) for i in range(n)]
+    y = [math.sin(i / 10) for i in range(n)]
+    return x, y
+
+@pytest.mark.parametrize("n, threshold", [(1000, 100), (1000, 3), (101, 50), (10000, 500)])
+def test_lttb_length_and_endpoints(n, threshold):
+    x, y = series(n)
+    indices = lttb(x, y, threshold)
+    assert len(indices) == threshold
+    assert indices[0] == 0 and indices[-1] == n - 1
+    assert indices == sorted(set(indices))
+
+def test_lttb_keeps_a_spike():
+    x, y = series(1000)
+    y[537] = 100.0
+    assert 537 in lttb(x, y, 50)
+
+@pytest.mark.parametrize("threshold", [10, 1000])
+def test_lttb_returns_short_series_unchanged(threshold):
+    x, y = series(10)
+    assert lttb(x, y, threshold) == list(range(10))
+
+def test_lttb_below_three_points():
+    x, y = series(10)
+    assert lttb(x, y, 2) == [0, 9]
+    assert lttb(x, y, 1) == [0]
+
+def test_min_max_buckets_keep_the_extremes():
+    y = [200] * 1000
+    y[123] = 0  # outage
+    y[876] = 503
+    indices = min_max_buckets(y, 20)
+    assert len(indices) <= 20
+    assert indices == sorted(set(indices))
+    assert 123 in indices and 876 in indices
+
+def test_min_max_buckets_keep_every_bucket_extreme():
+    y = [(i * 37) % 101 for i in range(1000)]
+    indices = min_max_buckets(y, 100)
+    for bucket in range(50):
+        values = y[bucket * 20:(bucket + 1) * 20]
+        kept = [y[i] for i in indices if bucket * 20 <= i < (bucket + 1) * 20]
+        assert min(values) in kept and max(values) in kept
+
+def test_min_max_buckets_return_short_series_unchanged():
+    assert min_max_buckets([1, 2, 3], 10) == [0, 1, 2]
@@ -0,0 +1,62 @@
+import asyncio
+from datetime import datetime, timezone
+import pytest
+import models
+from database import AsyncSessionLocal
+from services.event_broker import event_broker
+from services.event_relay import start_event_relay, stop_event_relay
+
+@pytest.mark.asyncio
+async def test_relay_publishes_results_written_by_other_processes(tables):
+    subscription = event_broker.subscribe([1])
+    await start_event_relay(interval=0.01)
+    try:
+        await asyncio.sleep(0.05)
+        async with AsyncSessionLocal() as db:
+            db.add(models.MonitoringResult(
+                website_id=1, timestamp=datetime.now(timezone.utc), is_up=True, status_code=200, response_time=0.1
+            ))
+            await db.commit()
+
+        event = await asyncio.wait_for(subscription.get(), timeout=2.0)
+        assert event["type"] == "result"
+        assert event["data"]["status_code"] == 200
+        assert "id" not in event["data"]
+        assert event["data"]["timestamp"].tzinfo is not None
+
+        # Rows written locally are only published by the relay
+        event_broker.publish_results([{"website_id": 1, "is_up": True, "status_code": 200}])
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(subscription.get(), timeout=0.1)
+    finally:
+        await stop_event_relay()
+        event_broker.unsubscribe(subscription)
+    assert not event_broker.relayed
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode, probe_processes, relayed", [
+    ("inprocess", 1, False),
+    ("inprocess", 2, True),
+    ("queue", 1, True),
+])
+async def test_lifespan_relays_results_written_by_other_processes(tables, monkeypatch, mode, probe_processes, relayed):
+    import main
+
+    started = []
+
+    async def start_probe_processes():
+        started.append(True)
+
+    async def start_scheduler(run_check):
+        pass
+
+    monkeypatch.setattr(main.config, "SCHEDULER_MODE", mode)
+    monkeypatch.setattr(main.config, "PROBE_PROCESSES", probe_processes)
+    monkeypatch.setattr(main.config, "RETENTION_ENABLED", False)
+    monkeypatch.setattr(main, "start_probe_processes", start_probe_processes)
+    monkeypatch.setattr(main, "start_scheduler", start_scheduler)
+    monkeypatch.setattr(main, "get_probe_processes", lambda: object() if started else None)
+
+    async with main.lifespan(main.app):
+        assert event_broker.relayed == relayed
+    assert not event_broker.relayed
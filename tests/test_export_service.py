@@ -0,0 +1,43 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+import models
+from database import AsyncSessionLocal
+from services.export_service import arrow_available, export_history
+
+TIMESTAMP = datetime(2026, 10, 16, 12, 0, 30, tzinfo=timezone.utc)
+
+@pytest_asyncio.fixture
+async def stored_result(tables):
+    async with AsyncSessionLocal() as db:
+        db.add(models.Website(id=1, url="https://example.com/", name="Example", owner_id=1))
+        db.add(models.MonitoringResult(website_id=1, timestamp=TIMESTAMP, is_up=True, status_code=200, response_time=0.1))
+        await db.commit()
+
+async def export(export_format):
+    return b"".join([
+        chunk async for chunk in export_history("results", export_format, select(models.Website.id))
+    ])
+
+@pytest.mark.asyncio
+async def test_ndjson_timestamps_are_iso_utc(stored_result):
+    (row,) = [json.loads(line) for line in (await export("ndjson")).decode().splitlines()]
+    assert row["timestamp"] == TIMESTAMP.isoformat()
+
+@pytest.mark.asyncio
+async def test_csv_timestamps_are_iso_utc(stored_result):
+    (row,) = csv.DictReader(io.StringIO((await export("csv")).decode()))
+    assert row["timestamp"] == TIMESTAMP.isoformat()
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not arrow_available(), reason="pyarrow is not installed")
+async def test_arrow_timestamps_are_utc(stored_result):
+    import pyarrow as pa
+
+    table = pa.ipc.open_stream(await export("arrow")).read_all()
+    assert str(table.schema.field("timestamp").type) == "timestamp[us, tz=UTC]"
+    assert table.column("timestamp")[0].as_py() == TIMESTAMP
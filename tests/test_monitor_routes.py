@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import select
+import models
+from database import AsyncSessionLocal
+
+async def add_website(user, url="https://example.com/"):
+    async with AsyncSessionLocal() as db:
+        website = models.Website(url=url, name="Example", owner_id=user.id)
+        db.add(website)
+        await db.commit()
+        return website.id
+
+async def add_results(website_id, timestamps):
+    async with AsyncSessionLocal() as db:
+        db.add_all([
+            models.MonitoringResult(website_id=website_id, timestamp=timestamp, is_up=True, status_code=200, response_time=0.1)
+            for timestamp in timestamps
+        ])
+        await db.commit()
+
+async def fetch_all_pages(api, website_id, limit):
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = await api.get(f"/monitor/websites/{website_id}/results", params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count", [25, 20])
+async def test_results_cursor_pages_without_duplicates_or_gaps(api, user, count):
+    website_id = await add_website(user)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    # Groups of three rows share a timestamp, so pages split ties
+    await add_results(website_id, [start + timedelta(minutes=i // 3) for i in range(count)])
+
+    pages = await fetch_all_pages(api, website_id, limit=10)
+
+    assert [len(page) for page in pages] == [10] * (count // 10) + ([count % 10] if count % 10 else [])
+    ids = [row["id"] for page in pages for row in page]
+    assert len(ids) == len(set(ids)) == count
+    keys = [(row["timestamp"], row["id"]) for page in pages for row in page]
+    assert keys == sorted(keys, reverse=True)
+
+@pytest.mark.asyncio
+async def test_results_rejects_malformed_cursor(api, user):
+    website_id = await add_website(user)
+    response = await api.get(f"/monitor/websites/{website_id}/results", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+def error_rows(body):
+    return {error["row"]: error["error"] for error in body["errors"]}
+
+@pytest.mark.asyncio
+async def test_bulk_import_json_reports_invalid_and_duplicate_rows(api, user):
+    await add_website(user, "https://existing.example.com/")
+    response = await api.post("/monitor/websites/bulk", json=[
+        {"url": "https://a.example.com", "name": "A"},
+        {"url": "not a url", "name": "Broken"},
+        {"url": "HTTPS://A.example.com:443/", "name": "A again"},
+        {"url": "https://existing.example.com", "name": "Existing"},
+        {"url": "https://b.example.com", "name": "B", "monitoring_interval": 0},
+        {"url": "https://c.example.com", "name": "C", "monitoring_interval": 600},
+    ])
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["failed"]) == (2, 4)
+    errors = error_rows(body)
+    assert errors[2].startswith("url:")
+    assert errors[3] == "url: Duplicate of row 1"
+    assert errors[4] == "url: Duplicate of an existing website"
+    assert errors[5].startswith("monitoring_interval:")
+
+    async with AsyncSessionLocal() as db:
+        websites = {
+            website.name: website
+            for website in (await db.execute(select(models.Website).where(models.Website.id.in_(body["website_ids"])))).scalars()
+        }
+    assert set(websites) == {"A", "C"}
+    assert websites["C"].monitoring_interval == 600
+    assert all(website.initial_check_status == "pending" for website in websites.values())
+
+@pytest.mark.asyncio
+async def test_bulk_import_csv_body_reports_malformed_rows(api, user):
+    csv_data = (
+        "url,name,monitoring_interval\n"
+        "https://a.example.com,A,\n"
+        "https://b.example.com\n"  # missing the name column
+        "https://c.example.com,C,often\n"
+    )
+    response = await api.post("/monitor/websites/bulk", content=csv_data, headers={"Content-Type": "text/csv"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["failed"]) == (1, 2)
+    errors = error_rows(body)
+    assert errors[2].startswith("name:")
+    assert errors[3].startswith("monitoring_interval:")
+
+@pytest.mark.asyncio
+async def test_bulk_import_multipart_upload(api, user):
+    csv_data = "url,name\nhttps://a.example.com,A\nhttps://b.example.com,B\n"
+    response = await api.post("/monitor/websites/bulk", files={"file": ("sites.csv", csv_data, "text/csv")})
+
+    assert response.status_code == 200
+    assert response.json()["created"] == 2
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kwargs", [
+    {"json": {"url": "https://a.example.com", "name": "A"}},
+    {"content": b"\xff\xfe", "headers": {"Content-Type": "text/csv"}},
+    {"files": {"other": ("sites.csv", "url,name\n", "text/csv")}},
+])
+async def test_bulk_import_rejects_unreadable_bodies(api, user, kwargs):
+    response = await api.post("/monitor/websites/bulk", **kwargs)
+    assert response.status_code == 400
@@ -0,0 +1,110 @@
+import ssl
+from datetime import datetime, timedelta, timezone
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+import services.monitor_service as monitor_service
+from services.http_client import TLSResponse
+from services.monitor_service import _read_body
+
+BODY = b"x" * 1_000_000
+
+async def serve(handler, ssl_context=None):
+    app = web.Application()
+    app.router.add_get("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=ssl_context)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+@pytest_asyncio.fixture
+async def server_url():
+    async def handler(request):
+        return web.Response(body=BODY)
+
+    runner, port = await serve(handler)
+    yield f"http://127.0.0.1:{port}/"
+    await runner.cleanup()
+
+@pytest.fixture(scope="module")
+def certificate(tmp_path_factory):
+    """A self-signed certificate for localhost, as (cert file, key file)."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=30))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    directory = tmp_path_factory.mktemp("tls")
+    cert_file, key_file = directory / "cert.pem", directory / "key.pem"
+    cert_file.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_file.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+    return str(cert_file), str(key_file)
+
+@pytest.mark.asyncio
+async def test_read_body_stops_at_max_bytes(server_url):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(server_url) as response:
+            assert await _read_body(response, max_bytes=1000) is not None
+            assert not response.content.at_eof()
+            # The unread rest of the body is not kept around for reuse
+            assert response.closed
+
+@pytest.mark.asyncio
+async def test_read_body_reads_short_bodies_completely(server_url):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(server_url) as response:
+            assert await _read_body(response, max_bytes=len(BODY) * 2) is not None
+            assert response.content.at_eof()
+
+@pytest.mark.asyncio
+async def test_read_body_can_be_disabled(server_url):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(server_url) as response:
+            assert await _read_body(response, max_bytes=0) is None
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [2, 16 * 1024, 64 * 1024])
+async def test_probe_reads_certificate_of_small_https_responses(certificate, monkeypatch, size):
+    cert_file, key_file = certificate
+    server_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server_context.load_cert_chain(cert_file, key_file)
+    client_context = ssl.create_default_context(cafile=cert_file)
+
+    async def handler(request):
+        return web.Response(body=b"x" * size)
+
+    async def no_second_handshake(url):
+        raise AssertionError("probe opened a separate certificate check")
+
+    runner, port = await serve(handler, server_context)
+    session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=client_context), response_class=TLSResponse)
+    monkeypatch.setattr(monitor_service, "get_http_client", lambda: session)
+    monkeypatch.setattr(monitor_service, "check_ssl_certificate", no_second_handshake)
+    try:
+        # The second probe runs on the pooled connection of the first
+        for _ in range(2):
+            result = await monitor_service.probe_website(f"https://localhost:{port}/")
+            assert result["health"]["is_up"]
+            assert result["ssl"]["is_valid"]
+            assert result["ssl"]["issuer"]
+    finally:
+        await session.close()
+        await runner.cleanup()
@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from services.probe_processes import ProbeProcessPool, combine_scheduler_stats
+
+class DeadProcess:
+    name = "probe-1"
+    exitcode = -9
+
+    def is_alive(self):
+        return False
+
+class LiveProcess:
+    name = "probe-0"
+
+    def is_alive(self):
+        return True
+
+def test_combine_scheduler_stats_sums_counts_and_keeps_worst_lag():
+    combined = combine_scheduler_stats([
+        {"scheduled_websites": 10, "overdue_checks": 1, "current_lag_seconds": 0.5, "max_lag_seconds": 3.0},
+        {"scheduled_websites": 5, "overdue_checks": 0, "current_lag_seconds": 2.0, "max_lag_seconds": 1.0},
+    ])
+    assert combined == {
+        "scheduled_websites": 15,
+        "overdue_checks": 1,
+        "current_lag_seconds": 2.0,
+        "max_lag_seconds": 3.0,
+    }
+
+def test_combine_scheduler_stats_without_reports():
+    assert combine_scheduler_stats([]) == {}
+
+@pytest.mark.asyncio
+async def test_watchdog_respawns_dead_processes():
+    pool = ProbeProcessPool(processes=2)
+    pool._stop = asyncio.Event()
+    pool._processes = [LiveProcess(), DeadProcess()]
+    pool._shard_stats = {0: {"scheduled_websites": 1}, 1: {"scheduled_websites": 2}}
+    spawned = []
+
+    def spawn(index):
+        spawned.append(index)
+        pool._processes[index] = LiveProcess()
+
+    pool._spawn = spawn
+    watchdog = asyncio.create_task(pool._watch(interval=0.01))
+    try:
+        await asyncio.sleep(0.05)
+    finally:
+        pool._stop.set()
+        await asyncio.wait_for(watchdog, timeout=1.0)
+
+    assert spawned == [1]
+    assert pool.stats()["restarts"] == 1
+    # The dead process's stats are dropped until its replacement reports
+    assert pool.scheduler_stats() == {"scheduled_websites": 1}
+    pool._executor.shutdown()
@@ -0,0 +1,24 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import func, select
+import models
+from database import AsyncSessionLocal
+from services.retention import delete_in_batches
+
+@pytest.mark.asyncio
+async def test_delete_in_batches_removes_only_expired_rows(tables):
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        db.add(models.Website(id=1, url="https://example.com/", name="Example", owner_id=1))
+        db.add_all([
+            models.MonitoringResult(website_id=1, timestamp=now - timedelta(days=days), is_up=True, status_code=200, response_time=0.1)
+            for days in [30] * 7 + [1] * 3
+        ])
+        await db.commit()
+
+    table = models.MonitoringResult.__table__
+    removed = await delete_in_batches(table, table.c.timestamp < now - timedelta(days=14), batch_size=3)
+
+    assert removed == 7
+    async with AsyncSessionLocal() as db:
+        assert await db.scalar(select(func.count()).select_from(table)) == 3
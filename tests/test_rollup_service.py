@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import select
+import models
+from database import AsyncSessionLocal
+from services.rollup_service import apply_results, histogram_bucket, histogram_percentile, summarize_rollup
+
+START = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+def result(seconds, response_time, status_code=200):
+    return {
+        "website_id": 1,
+        "timestamp": START + timedelta(seconds=seconds),
+        "is_up": 0 < status_code < 400,
+        "status_code": status_code,
+        "response_time": response_time,
+    }
+
+async def apply(rows):
+    async with AsyncSessionLocal() as db:
+        await apply_results(db, rows)
+        await db.commit()
+
+async def rollups(resolution):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(models.MonitoringRollup).where(
+                models.MonitoringRollup.resolution == resolution
+            ).order_by(models.MonitoringRollup.bucket_start)
+        )
+        return result.scalars().all()
+
+@pytest.mark.asyncio
+async def test_incremental_batches_merge_into_rollups(tables):
+    await apply([result(5, 0.1), result(10, 0.3, status_code=503)])
+    # Crosses into the next minute; the failed check has no response time
+    await apply([result(50, 0.2), result(70, 0.4), result(80, 0.0, status_code=0)])
+
+    minutes = await rollups("minute")
+    assert [rollup.bucket_start.replace(tzinfo=timezone.utc) for rollup in minutes] == [START, START + timedelta(minutes=1)]
+    first, second = minutes
+    assert (first.count, first.up_count, first.response_count) == (3, 2, 3)
+    assert first.response_time_sum == pytest.approx(0.6)
+    assert first.status_codes == {"200": 2, "503": 1}
+    assert (second.count, second.up_count, second.response_count) == (2, 1, 1)
+    assert second.status_codes == {"200": 1, "0": 1}
+
+    for resolution in ("hour", "day"):
+        (rollup,) = await rollups(resolution)
+        assert (rollup.count, rollup.up_count, rollup.response_count) == (5, 3, 4)
+        assert rollup.status_codes == {"200": 3, "503": 1, "0": 1}
+        assert sum(rollup.response_time_histogram.values()) == 4
+
+@pytest.mark.asyncio
+async def test_percentiles_from_merged_histograms(tables):
+    # 10 ms to 1 s in 10 ms steps, split over several batches
+    latencies = [i / 100 for i in range(1, 101)]
+    for batch_start in range(0, 100, 30):
+        await apply([result(i % 60, latency) for i, latency in enumerate(latencies[batch_start:batch_start + 30], batch_start)])
+
+    (hour,) = await rollups("hour")
+    stats = summarize_rollup(hour)
+    assert stats["count"] == 100
+    assert stats["uptime_ratio"] == 1.0
+    assert stats["mean_response_time"] == pytest.approx(0.505)
+    # Buckets span 10%, so estimates are within about 5% of the true value
+    assert stats["p50_response_time"] == pytest.approx(0.50, rel=0.1)
+    assert stats["p95_response_time"] == pytest.approx(0.95, rel=0.1)
+    assert stats["p99_response_time"] == pytest.approx(0.99, rel=0.1)
+
+def test_histogram_percentile_of_empty_histogram():
+    assert histogram_percentile({}, 50) is None
+
+def test_sub_millisecond_times_share_the_first_bucket():
+    assert histogram_bucket(0.0) == histogram_bucket(0.0005) == 0
@@ -0,0 +1,137 @@
+import asyncio
+import pytest
+from pydantic import ValidationError
+import config
+import schemas
+from services.scheduler import CheckScheduler, clamp_interval, next_phase_slot
+
+class StaticScheduler(CheckScheduler):
+    """Scheduler whose active websites come from a list instead of the database."""
+
+    def __init__(self, run_check, websites, **kwargs):
+        super().__init__(run_check, sync_interval=3600, **kwargs)
+        self.websites = websites
+
+    async def _load_active_websites(self):
+        return self.websites
+
+async def wait_for(condition, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        if loop.time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+@pytest.mark.parametrize("interval", [0, -5])
+def test_website_create_rejects_short_intervals(interval):
+    with pytest.raises(ValidationError):
+        schemas.WebsiteCreate(url="https://example.com", name="Example", monitoring_interval=interval)
+
+def test_website_create_accepts_minimum_interval():
+    website = schemas.WebsiteCreate(
+        url="https://example.com", name="Example", monitoring_interval=config.MIN_MONITORING_INTERVAL
+    )
+    assert website.monitoring_interval == config.MIN_MONITORING_INTERVAL
+
+@pytest.mark.parametrize("interval", [None, 0, -5, 1])
+def test_clamp_interval_is_never_below_minimum(interval):
+    assert clamp_interval(interval) >= max(config.MIN_MONITORING_INTERVAL, 1)
+
+@pytest.mark.parametrize("interval", [300, 0, -5])
+def test_next_phase_slot_is_strictly_after_and_within_an_interval(interval):
+    after = 1_000_000.0
+    slot = next_phase_slot("https://example.com/", interval, after)
+    assert after < slot <= after + clamp_interval(interval)
+    assert next_phase_slot("https://example.com/", interval, slot) == pytest.approx(slot + clamp_interval(interval))
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("interval", [0, -5])
+async def test_bad_interval_does_not_stall_the_scheduler(interval):
+    checked = []
+
+    async def run_check(website_ids):
+        checked.extend(website_ids)
+
+    scheduler = StaticScheduler(run_check, [])
+    await scheduler.start()
+    try:
+        scheduler.schedule(1, "https://bad.example.com", interval)
+        scheduler.schedule(2, "https://good.example.com", 300)
+        await wait_for(lambda: {1, 2} <= set(checked))
+        # The event loop is still responsive and each website ran once
+        await asyncio.sleep(0.05)
+        assert sorted(checked) == [1, 2]
+        assert scheduler.stats()["scheduled_websites"] == 2
+    finally:
+        await scheduler.stop()
+
+@pytest.mark.asyncio
+async def test_failing_item_does_not_kill_the_loop():
+    checked = []
+
+    async def run_check(website_ids):
+        checked.extend(website_ids)
+
+    scheduler = StaticScheduler(run_check, [])
+    dispatch = scheduler._dispatch
+
+    def failing_dispatch(target, website_ids):
+        if target == "https://broken.example.com/":
+            raise RuntimeError("boom")
+        return dispatch(target, website_ids)
+
+    scheduler._dispatch = failing_dispatch
+    await scheduler.start()
+    try:
+        scheduler.schedule(1, "https://broken.example.com", 300)
+        await asyncio.sleep(0.05)
+        scheduler.schedule(2, "https://good.example.com", 300)
+        await wait_for(lambda: 2 in checked)
+        assert not scheduler._task.done()
+        # The broken target was dropped until the next sync
+        assert scheduler.stats()["scheduled_websites"] == 1
+    finally:
+        await scheduler.stop()
+
+@pytest.mark.asyncio
+async def test_sync_starts_websites_in_their_phase_slot():
+    async def run_check(website_ids):
+        pass
+
+    scheduler = StaticScheduler(run_check, [(1, "https://example.com", 300)])
+    await scheduler.start()
+    try:
+        due = scheduler._websites[1]["due"]
+        now = asyncio.get_running_loop().time()
+        assert now < due <= now + 300
+    finally:
+        await scheduler.stop()
+
+@pytest.mark.asyncio
+async def test_new_website_is_checked_when_the_running_check_ends():
+    checked = []
+    release = asyncio.Event()
+
+    async def run_check(website_ids):
+        checked.append(sorted(website_ids))
+        await release.wait()
+
+    scheduler = StaticScheduler(run_check, [])
+    await scheduler.start()
+    try:
+        scheduler.schedule(1, "https://example.com", 300)
+        await wait_for(lambda: checked == [[1]])
+        # Due while the check of website 1 is still running
+        scheduler.schedule(2, "https://example.com", 300)
+        await asyncio.sleep(0.05)
+        assert checked == [[1]]
+        assert scheduler.stats()["skipped_checks"] == 1
+
+        release.set()
+        await wait_for(lambda: len(checked) == 2)
+        # Not a full interval later
+        assert 2 in checked[1]
+        assert scheduler._websites[2]["checked"]
+    finally:
+        await scheduler.stop()
@@ -0,0 +1,39 @@
+import pytest
+from sqlalchemy import update
+import models
+from database import AsyncSessionLocal
+from utils.security import create_access_token, get_current_user, user_cache_stats
+
+async def current_user(token):
+    async with AsyncSessionLocal() as db:
+        return await get_current_user(token=token, db=db)
+
+@pytest.mark.asyncio
+async def test_deactivating_a_user_invalidates_the_cached_copy(user):
+    token = create_access_token({"sub": user.email})
+    assert (await current_user(token)).is_active
+    hits = user_cache_stats()["hits"]
+    assert (await current_user(token)).is_active
+    assert user_cache_stats()["hits"] == hits + 1
+
+    async with AsyncSessionLocal() as db:
+        db_user = await db.get(models.User, user.id)
+        db_user.is_active = False
+        await db.commit()
+
+    assert not (await current_user(token)).is_active
+
+@pytest.mark.asyncio
+async def test_rolled_back_changes_keep_the_cached_copy(user):
+    token = create_access_token({"sub": user.email})
+    await current_user(token)
+
+    async with AsyncSessionLocal() as db:
+        db_user = await db.get(models.User, user.id)
+        db_user.is_active = False
+        await db.flush()
+        await db.rollback()
+
+    hits = user_cache_stats()["hits"]
+    assert (await current_user(token)).is_active
+    assert user_cache_stats()["hits"] == hits + 1
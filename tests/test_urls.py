@@ -0,0 +1,18 @@
+from utils.urls import normalize_url, url_shard
+
+def test_normalize_url_treats_equivalent_spellings_alike():
+    assert normalize_url("HTTPS://Example.COM:443") == "https://example.com/"
+
+def test_url_shard_keeps_a_host_in_one_shard():
+    urls = [
+        "https://example.com/",
+        "https://example.com/status",
+        "http://EXAMPLE.com./health?full=1",
+        "https://example.com:8443/api",
+    ]
+    for shards in (2, 3, 8):
+        assert len({url_shard(url, shards) for url in urls}) == 1
+
+def test_url_shard_spreads_hosts():
+    shards = {url_shard(f"https://host{i}.example.com/", 4) for i in range(100)}
+    assert shards == {0, 1, 2, 3}